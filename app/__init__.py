@@ -1,20 +1,32 @@
 import os
-from flask import Flask, render_template, request, session, redirect
+from flask import Flask, abort, render_template, request, session, redirect
 from flask_cors import CORS
 from flask_migrate import Migrate
-from flask_wtf.csrf import CSRFProtect, generate_csrf
+from flask_wtf.csrf import CSRFProtect, generate_csrf, validate_csrf
 from flask_login import LoginManager
-from .models import db, User
+from wtforms.validators import ValidationError
+from .models import db
 from .api.user_routes import user_routes
 from .api.auth_routes import auth_routes
 from .api.card_routes import cards_api
 from .api.card_section_routes import section_api
 from .api.favorite_routes import favorites_api
 from .api.board_routes import board_api
+from .api.metrics_routes import metrics_api
+from .api.batch_routes import batch_api
+from .api.bootstrap_routes import bootstrap_api
+from .api.search_routes import search_api
+from .api.label_routes import labels_api
+from . import (
+    board_cache, identity_cache, password_hashing, pool_metrics, replica_routing, sql_metrics, static_assets,
+)
 from .seeds import seed_commands
+from .benchmarks import bench_commands
 from .config import Config
+from .json_provider import FastJSONProvider
 
 app = Flask(__name__, static_folder='../react-vite/dist', static_url_path='/')
+app.json = FastJSONProvider(app)
 
 # Setup login manager
 login = LoginManager(app)
@@ -23,11 +35,12 @@ login.login_view = 'auth.unauthorized'
 
 @login.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    return identity_cache.load_user(int(id))
 
 
 # Tell flask about our seed commands
 app.cli.add_command(seed_commands)
+app.cli.add_command(bench_commands)
 
 app.config.from_object(Config)
 app.register_blueprint(user_routes, url_prefix='/api/users')
@@ -36,7 +49,20 @@ app.register_blueprint(cards_api, url_prefix='/api/cards')
 app.register_blueprint(section_api, url_prefix='/api/card-sections')
 app.register_blueprint(favorites_api, url_prefix='/api/favorites')
 app.register_blueprint(board_api, url_prefix='/api/boards')
+app.register_blueprint(metrics_api, url_prefix='/api/metrics')
+app.register_blueprint(batch_api, url_prefix='/api/batch')
+app.register_blueprint(bootstrap_api, url_prefix='/api/bootstrap')
+app.register_blueprint(search_api, url_prefix='/api/search')
+app.register_blueprint(labels_api, url_prefix='/api/labels')
+# Pool options must be final before the engine is created
+pool_metrics.init_app(app)
 db.init_app(app)
+replica_routing.init_app(app)
+sql_metrics.init_app(app)
+board_cache.init_app(app)
+identity_cache.init_app(app)
+password_hashing.init_app(app)
+static_assets.init_app(app)
 Migrate(app, db)
 
 # Application Security
@@ -57,8 +83,31 @@ def https_redirect():
             return redirect(url, code=code)
 
 
+def csrf_cookie_current():
+    """
+    True when the request already carries a csrf_token cookie that matches
+    the session and is less than half way to WTF_CSRF_TIME_LIMIT, so it
+    does not need to be issued again yet
+    """
+    token = request.cookies.get('csrf_token')
+    if not token:
+        return False
+    time_limit = app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    try:
+        validate_csrf(token, time_limit=time_limit // 2 if time_limit else None)
+    except ValidationError:
+        return False
+    return True
+
+
 @app.after_request
 def inject_csrf_token(response):
+    # Static files, the SPA shell and 304s stay cacheable: the client picks
+    # up its token from the first API response (GET /api/auth/ on load)
+    if not request.path.startswith('/api/') or response.status_code == 304:
+        return response
+    if csrf_cookie_current():
+        return response
     response.set_cookie(
         'csrf_token',
         generate_csrf(),
@@ -89,11 +138,34 @@ def react_root(path):
     react builds in the production environment for favicon
     or index.html requests
     """
-    if path == 'favicon.ico':
-        return app.send_from_directory('public', 'favicon.ico')
+    return spa_shell()
+
+
+def spa_shell():
+    if static_assets.enabled():
+        return static_assets.send_asset(app, 'index.html')
     return app.send_static_file('index.html')
 
 
+def static_file(filename):
+    """
+    Serves files from the react build, precompressed and from memory when
+    STATIC_ASSET_CACHE is on
+    """
+    if static_assets.enabled():
+        response = static_assets.send_asset(app, filename)
+        if response is None:
+            abort(404)
+        return response
+    return app.send_static_file(filename)
+
+
+app.view_functions['static'] = static_file
+
+
 @app.errorhandler(404)
 def not_found(e):
-    return app.send_static_file('index.html')
+    # Unknown API routes are real 404s, everything else is a client side route
+    if request.path.startswith('/api/'):
+        return {'errors': {'message': 'Not Found'}}, 404
+    return spa_shell()
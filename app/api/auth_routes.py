@@ -3,10 +3,25 @@ from app.models import User, db
 from app.forms import LoginForm
 from app.forms import SignUpForm
 from flask_login import current_user, login_user, logout_user, login_required
+from sqlalchemy.exc import IntegrityError
+from app.password_hashing import HashingBusy, needs_rehash
 
 auth_routes = Blueprint('auth', __name__)
 
 
+def duplicate_user_errors(error):
+    """
+    Maps a unique constraint violation on users to form-style errors
+    """
+    message = str(error.orig).lower()
+    errors = {}
+    if 'email' in message:
+        errors['email'] = ['Email address is already in use.']
+    if 'username' in message:
+        errors['username'] = ['Username is already in use.']
+    return errors or {'username': ['Username or email is already in use.']}
+
+
 @auth_routes.route('/')
 def authenticate():
     """
@@ -28,7 +43,15 @@ def login():
     form['csrf_token'].data = request.cookies['csrf_token']
     if form.validate_on_submit():
         # Add the user to the session, we are logged in!
-        user = User.query.filter(User.email == form.data['email']).first()
+        # The form already looked the user up while validating
+        user = form.user
+        if needs_rehash(user.hashed_password):
+            # Upgrade hashes made with older parameters while we know the password
+            try:
+                user.password = form.data['password']
+                db.session.commit()
+            except HashingBusy:
+                pass
         login_user(user)
         return user.to_dict()
     return form.errors, 401
@@ -57,7 +80,13 @@ def sign_up():
             password=form.data['password']
         )
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # The unique constraints are the single source of truth for
+            # duplicates, no lookups before the insert
+            db.session.rollback()
+            return duplicate_user_errors(e), 401
         login_user(user)
         return user.to_dict()
     return form.errors, 401
@@ -0,0 +1,165 @@
+from urllib.parse import urlsplit
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import login_required
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from app.models import db
+
+# Initialize blueprint
+batch_api = Blueprint("batch", __name__)
+
+# Most sub-requests a single batch may carry
+MAX_BATCH_SIZE = 50
+BATCH_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+# Sub-request headers passed through to the target route
+FORWARDED_HEADERS = ("If-None-Match",)
+# Sub-requests skipped after a failure in an atomic batch
+NOT_EXECUTED = 424
+# Session changing and nested batch routes only make sense on their own
+BLOCKED_BLUEPRINTS = ("auth", "batch")
+
+
+def routed_blueprint(path, method):
+    """
+    Blueprint of the route the path resolves to, or None if it matches none
+    (the sub-request then gets its 404 or 405 from dispatch)
+    """
+    adapter = current_app.url_map.bind("localhost")
+    path = urlsplit(path).path
+    try:
+        endpoint, _ = adapter.match(path, method=method)
+    except RequestRedirect as e:
+        # e.g. a missing trailing slash: check where it would end up
+        endpoint, _ = adapter.match(urlsplit(e.new_url).path, method=method)
+    except HTTPException:
+        return None
+    return endpoint.rpartition(".")[0] or None
+
+
+def validate_batch(payload):
+    """
+    Checks the batch body
+    Returns tuple of (sub_requests, atomic, error_response)
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("requests"), list):
+        return None, None, ({"error": "Bad Request", "message": "requests must be a list"}, 400)
+
+    sub_requests = payload["requests"]
+    if not sub_requests or len(sub_requests) > MAX_BATCH_SIZE:
+        return None, None, (
+            {"error": "Bad Request", "message": f"A batch holds between 1 and {MAX_BATCH_SIZE} requests"},
+            400,
+        )
+
+    for index, sub_request in enumerate(sub_requests):
+        if not isinstance(sub_request, dict):
+            return None, None, ({"error": "Bad Request", "message": f"Request {index} must be an object"}, 400)
+        method = str(sub_request.get("method", "GET")).upper()
+        path = sub_request.get("path")
+        if method not in BATCH_METHODS:
+            return None, None, ({"error": "Bad Request", "message": f"Request {index} has an unsupported method"}, 400)
+        # Percent escapes would be decoded before routing, so paths must be plain
+        if (
+            not isinstance(path, str)
+            or not path.startswith("/api/")
+            or "%" in path
+            or routed_blueprint(path, method) in BLOCKED_BLUEPRINTS
+        ):
+            return None, None, ({"error": "Bad Request", "message": f"Request {index} has an invalid path"}, 400)
+
+    return sub_requests, bool(payload.get("atomic")), None
+
+
+def dispatch(sub_request):
+    """
+    Runs one sub-request through its route in-process. The application
+    context, and with it the logged in user, SQL metrics and CSRF token on g,
+    is shared with the batch request; per-request hooks are not run again.
+    """
+    headers = {
+        name: sub_request["headers"][name]
+        for name in FORWARDED_HEADERS
+        if isinstance(sub_request.get("headers"), dict) and name in sub_request["headers"]
+    }
+    if "Cookie" in request.headers:
+        headers["Cookie"] = request.headers["Cookie"]
+
+    app = current_app._get_current_object()
+    with app.test_request_context(
+        sub_request["path"],
+        method=str(sub_request.get("method", "GET")).upper(),
+        json=sub_request.get("body"),
+        headers={**headers, "Accept": "application/json"},
+    ):
+        http_error = None
+        try:
+            rv = app.dispatch_request()
+        except Exception as e:
+            if isinstance(e, HTTPException):
+                http_error = e
+            # HTTP errors and registered handlers (404, 503 for busy hashing)
+            try:
+                rv = app.handle_user_exception(e)
+            except Exception:
+                app.logger.exception("Batch sub-request to %s failed", sub_request["path"])
+                rv = ({"error": "Internal Server Error"}, 500)
+                # An atomic batch rolls back at the end; otherwise a failed
+                # flush would leave the session unusable for the next request
+                if not db.session().commits_deferred:
+                    db.session.rollback()
+        response = app.make_response(rv)
+        # HTTP errors without a handler of their own (405) come back as HTML
+        if http_error is not None and not response.is_json:
+            response = app.make_response(
+                ({"error": http_error.name, "message": http_error.description}, http_error.code)
+            )
+
+        result = {"status": response.status_code}
+        if response.is_json:
+            result["body"] = response.get_json()
+        elif response.status_code != 304:
+            result["body"] = response.get_data(as_text=True)
+        for name in ("ETag", "Link"):
+            if name in response.headers:
+                result.setdefault("headers", {})[name] = response.headers[name]
+        return result
+
+
+@batch_api.route("", methods=["POST"])
+@login_required
+def run_batch():
+    """
+    Runs a list of API requests in one round trip, results in the same order.
+    Body: {"requests": [{"method", "path", "body", "headers"}], "atomic": bool}
+    An atomic batch commits only if every request succeeds; after the first
+    failure the rest are skipped with status 424 and nothing is committed.
+    """
+    # Ensure CSRF token is present
+    if "csrf_token" not in request.cookies:
+        return jsonify({"error": "CSRF token missing"}), 400
+
+    sub_requests, atomic, error = validate_batch(request.get_json(silent=True))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    if not atomic:
+        return jsonify({"responses": [dispatch(sub_request) for sub_request in sub_requests]})
+
+    # Routes commit as they go; inside an atomic batch those commits only
+    # flush, and the batch commits or rolls back once at the end
+    responses = []
+    failed = False
+    with db.session().deferred_commits():
+        for sub_request in sub_requests:
+            if failed:
+                responses.append({"status": NOT_EXECUTED, "body": {"error": "Not executed"}})
+                continue
+            result = dispatch(sub_request)
+            responses.append(result)
+            failed = result["status"] >= 400
+
+    if failed:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return jsonify({"responses": responses, "committed": not failed})
@@ -1,11 +1,28 @@
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 from flask_login import login_required, current_user
-from app.models import Board, CardSection, db
+from app.models import Board, BoardChange, Card, CardSection, db, sync_card_labels
+from app.models.rank import is_valid_rank, rank_for_position
+from app.models.revision import RETAINED_CHANGES
 from app.forms import BoardForm, CardSectionForm
+from app.api.etag_utils import make_etag, not_modified, with_etag
+from app.api.pagination import keyset_page, page_args
+from app.board_cache import cached_response
+from sqlalchemy import insert, select
 from sqlalchemy.exc import SQLAlchemyError
 
 board_api = Blueprint("boards", __name__)
 
+# Upper bound on change log rows replayed by the delta sync endpoint, and
+# never more than the log keeps
+MAX_CHANGES = RETAINED_CHANGES
+
+# Rows fetched per server-side cursor batch on export, cards per INSERT on import
+EXPORT_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+# Longest section title, card name and labels string (the column sizes)
+MAX_IMPORT_TEXT = 255
+
 
 # Helper function to verify board ownership
 def verify_board_access(board_id):
@@ -35,14 +52,21 @@ def verify_board_access(board_id):
 @board_api.route("")
 @login_required
 def get_user_boards():
-    """Retrieve all boards belonging to the current user"""
+    """Retrieve the current user's boards, one keyset page at a time"""
+    limit, after, error = page_args(key_types=(int,))
+    if error:
+        return jsonify(error[0]), error[1]
+
     # Query the database for user's boards
-    user_boards = Board.query.filter(Board.user_id == current_user.id).all()
+    user_boards, next_cursor = keyset_page(
+        Board.query.filter(Board.user_id == current_user.id), [Board.id], limit, after
+    )
 
     # Format response
     response = {
         "count": len(user_boards),
         "boards": [board.to_dict_basic() for board in user_boards],
+        "next": next_cursor,
     }
 
     return jsonify(response)
@@ -57,8 +81,16 @@ def get_board(board_id):
     if error:
         return jsonify(error[0]), error[1]
 
-    # Return detailed board information
-    return jsonify(board.to_dict_detail())
+    # Skip the card tables entirely if the client is current
+    etag = make_etag("board", board.id, board.revision)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    # Return detailed board information, serialized once per revision
+    return with_etag(cached_response(
+        "detail", board, lambda: board.load_graph().to_dict_detail()
+    ), etag)
 
 
 @board_api.route("", methods=["POST"])
@@ -128,6 +160,9 @@ def delete_board(board_id):
         return jsonify(error[0]), error[1]
 
     try:
+        # The change log is not mapped as a relationship, clear it in one statement
+        BoardChange.query.filter(BoardChange.board_id == board.id).delete(synchronize_session=False)
+
         # Delete the board (cascade will handle related entities)
         db.session.delete(board)
         db.session.commit()
@@ -139,6 +174,84 @@ def delete_board(board_id):
         return jsonify({"error": "Database error", "message": "Failed to delete board"}), 500
 
 
+@board_api.route("/<int:board_id>/changes")
+@login_required
+def get_board_changes(board_id):
+    """List cards and sections changed since a board revision"""
+    # Check board access
+    board, error = verify_board_access(board_id)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    since = request.args.get("since", type=int)
+    if since is None or since < 0:
+        return jsonify({"error": "Bad Request", "message": "since must be a non-negative revision"}), 400
+
+    if since > board.revision:
+        return jsonify({"error": "Bad Request", "message": "since is ahead of the board revision"}), 400
+
+    # Nothing new: the board row alone answers the request
+    etag = make_etag("board-changes", board.id, since, board.revision)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    response = {
+        "boardId": board.id,
+        "since": since,
+        "revision": board.revision,
+        "board": None,
+        "sections": [],
+        "cards": [],
+        "deleted": {"sections": [], "cards": []},
+    }
+    if since == board.revision:
+        return with_etag(jsonify(response), etag)
+
+    # Latest operation per entity, read through the (board_id, revision) index
+    changes = db.session.execute(
+        db.select(BoardChange.revision, BoardChange.entity_type, BoardChange.entity_id, BoardChange.op)
+        .where(BoardChange.board_id == board.id, BoardChange.revision > since)
+        .order_by(BoardChange.id)
+        .limit(MAX_CHANGES + 1)
+    ).all()
+
+    # Too far behind: a full reload is cheaper than replaying the log. Every
+    # revision logs at least one row, so a log that does not start right
+    # after `since` has been pruned (or predates the log) past the client
+    if len(changes) > MAX_CHANGES or not changes or changes[0].revision != since + 1:
+        return with_etag(jsonify({**response, "resync": True}), etag)
+
+    latest = {(entity_type, entity_id): op for _, entity_type, entity_id, op in changes}
+    upserted = {BoardChange.ENTITY_SECTION: [], BoardChange.ENTITY_CARD: []}
+    for (entity_type, entity_id), op in latest.items():
+        if entity_type == BoardChange.ENTITY_BOARD:
+            response["board"] = board.to_dict_basic()
+        elif op == BoardChange.OP_DELETE:
+            response["deleted"][f"{entity_type}s"].append(entity_id)
+        else:
+            upserted[entity_type].append(entity_id)
+
+    if upserted[BoardChange.ENTITY_SECTION]:
+        response["sections"] = [
+            section.to_dict_basic()
+            for section in CardSection.query.filter(
+                CardSection.id.in_(upserted[BoardChange.ENTITY_SECTION]),
+                CardSection.board_id == board.id,
+            )
+        ]
+    if upserted[BoardChange.ENTITY_CARD]:
+        response["cards"] = [
+            card.to_dict_basic()
+            for card in Card.query.filter(
+                Card.id.in_(upserted[BoardChange.ENTITY_CARD]),
+                Card.owner_id == current_user.id,
+            ).order_by(Card.card_section_id, Card.rank)
+        ]
+
+    return with_etag(jsonify(response), etag)
+
+
 # Section Management Routes
 @board_api.route("/<int:board_id>/sections")
 @login_required
@@ -149,12 +262,22 @@ def get_board_sections(board_id):
     if error:
         return jsonify(error[0]), error[1]
 
-    # Return sections
-    return jsonify({
-        "board_name": board.name,
-        "section_count": len(board.card_sections),
-        "sections": board.to_dict_detail()["CardSections"],
-    })
+    # Skip the card tables entirely if the client is current
+    etag = make_etag("board", board.id, board.revision)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    def build_sections():
+        graph = board.load_graph()
+        return {
+            "board_name": graph.name,
+            "section_count": len(graph.card_sections),
+            "sections": graph.to_dict_detail()["CardSections"],
+        }
+
+    # Return sections, serialized once per revision
+    return with_etag(cached_response("sections", board, build_sections), etag)
 
 
 @board_api.route("/<int:board_id>/sections", methods=["POST"])
@@ -173,7 +296,9 @@ def add_board_section(board_id):
     # Create section if form is valid
     if form.validate_on_submit():
         try:
-            section = CardSection(board_id=board.id, title=form.data["title"])
+            section = CardSection(
+                board_id=board.id, owner_id=board.user_id, title=form.data["title"]
+            )
 
             # Save to database
             db.session.add(section)
@@ -188,4 +313,204 @@ def add_board_section(board_id):
             return jsonify({"error": "Database error", "message": "Failed to create section"}), 500
 
     # Return validation errors
-    return jsonify({"error": "Validation failed", "details": form.errors}), 400
\ No newline at end of file
+    return jsonify({"error": "Validation failed", "details": form.errors}), 400
+
+# Export / Import Routes
+def export_lines(board):
+    """
+    Yields the board, its sections and its cards as NDJSON lines, reading
+    rows through server-side cursors so memory stays flat for huge boards
+    """
+    dumps = current_app.json.dumps
+    yield dumps({"type": "board", "name": board.name}) + "\n"
+
+    sections = db.session.execute(
+        select(CardSection.id, CardSection.title)
+        .where(CardSection.board_id == board.id)
+        .order_by(CardSection.id)
+        .execution_options(stream_results=True)
+    ).yield_per(EXPORT_BATCH_SIZE)
+    for section in sections:
+        yield dumps({"type": "section", "id": section.id, "title": section.title}) + "\n"
+
+    cards = db.session.execute(
+        select(
+            Card.card_section_id, Card.name, Card.description, Card.labels,
+            Card.due_date, Card.order, Card.rank,
+        )
+        .join(CardSection, CardSection.id == Card.card_section_id)
+        .where(CardSection.board_id == board.id)
+        .order_by(Card.card_section_id, Card.rank, Card.id)
+        .execution_options(stream_results=True)
+    ).yield_per(EXPORT_BATCH_SIZE)
+    for card in cards:
+        yield dumps({
+            "type": "card",
+            "sectionId": card.card_section_id,
+            "name": card.name,
+            "description": card.description,
+            "labels": card.labels,
+            "dueDate": card.due_date,
+            "order": card.order,
+            "rank": card.rank,
+        }) + "\n"
+
+
+@board_api.route("/<int:board_id>/export")
+@login_required
+def export_board(board_id):
+    """Stream a board with all sections and cards as NDJSON"""
+    # Check board access
+    board, error = verify_board_access(board_id)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    response = current_app.response_class(
+        stream_with_context(export_lines(board)), mimetype="application/x-ndjson"
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="board-{board.id}.ndjson"'
+    return response
+
+
+def parse_due_date(value):
+    """ISO 8601 string from an export to a naive UTC datetime"""
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def optional_text(record, field, line_number, max_length=None):
+    """String field of an import record, or None. Raises ValueError otherwise."""
+    value = record.get(field)
+    if value is not None and (not isinstance(value, str) or (max_length and len(value) > max_length)):
+        limit = f" ({max_length} characters max)" if max_length else ""
+        raise ValueError(f"Line {line_number}: {field} must be a string{limit}")
+    return value
+
+
+def export_id(record, field, line_number):
+    """Section id as written by the export; only used to match cards to sections"""
+    value = record.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"Line {line_number}: {field} must be an integer or a string")
+    return value
+
+
+def import_lines(lines, user_id):
+    """
+    Creates a board from NDJSON lines as they arrive, inserting cards in
+    bulk batches. Raises ValueError on malformed input.
+    Returns the new board id
+    """
+    board_id, section_ids, card_batch = None, {}, []
+    # Cards seen per section, the fallback position for cards without a usable rank
+    section_card_counts = {}
+    cards_table = Card.__table__
+
+    def flush_cards():
+        if card_batch:
+            db.session.execute(insert(cards_table), card_batch)
+            card_batch.clear()
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = current_app.json.loads(line)
+            record_type = record["type"]
+        except (ValueError, TypeError, KeyError):
+            raise ValueError(f"Line {line_number}: not a valid export record")
+
+        if board_id is None and record_type != "board":
+            raise ValueError(f"Line {line_number}: the first record must be the board")
+
+        if record_type == "board":
+            if board_id is not None:
+                raise ValueError(f"Line {line_number}: only one board per import")
+            name = record.get("name")
+            if not isinstance(name, str) or not name.strip() or len(name) > 50:
+                raise ValueError(f"Line {line_number}: board name is required (50 characters max)")
+            board_id = db.session.execute(
+                insert(Board.__table__).values(name=name, user_id=user_id, revision=0)
+            ).inserted_primary_key[0]
+
+        elif record_type == "section":
+            title = record.get("title")
+            if not isinstance(title, str) or not title.strip() or len(title) > MAX_IMPORT_TEXT:
+                raise ValueError(f"Line {line_number}: section title is required ({MAX_IMPORT_TEXT} characters max)")
+            section_ids[export_id(record, "id", line_number)] = db.session.execute(
+                insert(CardSection.__table__).values(board_id=board_id, owner_id=user_id, title=title)
+            ).inserted_primary_key[0]
+
+        elif record_type == "card":
+            section_id = section_ids.get(export_id(record, "sectionId", line_number))
+            if section_id is None:
+                raise ValueError(f"Line {line_number}: card references an unknown section")
+            name = record.get("name")
+            if not isinstance(name, str) or not name.strip() or len(name) > MAX_IMPORT_TEXT:
+                raise ValueError(f"Line {line_number}: card name is required ({MAX_IMPORT_TEXT} characters max)")
+            description = optional_text(record, "description", line_number)
+            labels = optional_text(record, "labels", line_number, MAX_IMPORT_TEXT)
+            try:
+                due_date = parse_due_date(record.get("dueDate"))
+            except (ValueError, TypeError):
+                raise ValueError(f"Line {line_number}: dueDate must be an ISO 8601 date")
+
+            order = record.get("order")
+            if isinstance(order, bool) or not isinstance(order, int):
+                order = None
+            # A malformed rank would break every later move in its section
+            position = section_card_counts.get(section_id, 0)
+            section_card_counts[section_id] = position + 1
+            rank = record.get("rank")
+            if not is_valid_rank(rank, Card.rank.type.length):
+                rank = rank_for_position(position if order is None else order)
+            card_batch.append({
+                "card_section_id": section_id,
+                "owner_id": user_id,
+                "name": name,
+                "description": description,
+                "labels": labels,
+                "due_date": due_date,
+                "order": order,
+                "rank": rank,
+            })
+            if len(card_batch) >= IMPORT_BATCH_SIZE:
+                flush_cards()
+
+        else:
+            raise ValueError(f"Line {line_number}: unknown record type {record_type!r}")
+
+    if board_id is None:
+        raise ValueError("The import is empty")
+
+    flush_cards()
+    # Bulk inserts skip the ORM events that link cards to their labels
+    if section_ids:
+        sync_card_labels(db.session.connection(), cards_table.c.card_section_id.in_(list(section_ids.values())))
+    return board_id
+
+
+@board_api.route("/import", methods=["POST"])
+@login_required
+def import_board():
+    """Create a new board from an NDJSON export"""
+    # Ensure CSRF token is present
+    if "csrf_token" not in request.cookies:
+        return jsonify({"error": "CSRF token missing"}), 400
+
+    try:
+        board_id = import_lines(request.stream, current_user.id)
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": "Invalid import", "message": str(e)}), 400
+    except SQLAlchemyError:
+        db.session.rollback()
+        return jsonify({"error": "Database error", "message": "Failed to import board"}), 500
+
+    board = Board.query.get(board_id)
+    return jsonify({"message": "Board imported successfully", "board": board.to_dict_basic()}), 201
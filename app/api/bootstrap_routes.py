@@ -0,0 +1,85 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required, current_user
+from app.models import Board, Card, CardSection, Favorite, db
+from app.api.pagination import encode_cursor, page_args
+from sqlalchemy import exists, func, select, tuple_
+
+bootstrap_api = Blueprint("bootstrap", __name__)
+
+
+@bootstrap_api.route("")
+@login_required
+def bootstrap():
+    """
+    Everything the home page needs in one round trip: the current user,
+    their boards with section and card counts and an isFavorite flag, and
+    their favorites. Further board pages come from GET /api/boards?after=next.
+    Two statements, plus one for the user on an identity cache miss.
+    """
+    limit, after, error = page_args(key_types=(int,))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    section_count = (
+        select(func.count(CardSection.id))
+        .where(CardSection.board_id == Board.id)
+        .correlate(Board)
+        .scalar_subquery()
+    )
+    card_count = (
+        select(func.count(Card.id))
+        .join(CardSection, CardSection.id == Card.card_section_id)
+        .where(CardSection.board_id == Board.id)
+        .correlate(Board)
+        .scalar_subquery()
+    )
+    is_favorite = (
+        exists()
+        .where(Favorite.board_id == Board.id, Favorite.user_id == current_user.id)
+        .correlate(Board)
+    )
+
+    boards_query = (
+        select(
+            Board,
+            section_count.label("section_count"),
+            card_count.label("card_count"),
+            is_favorite.label("is_favorite"),
+        )
+        .where(Board.user_id == current_user.id)
+    )
+    if after is not None:
+        boards_query = boards_query.where(tuple_(Board.id) > tuple_(*after))
+    rows = db.session.execute(boards_query.order_by(Board.id).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].Board.id])
+
+    # Favorites may point at boards on other pages, so load them with their boards
+    favorites = db.session.execute(
+        select(Favorite, Board)
+        .join(Board, Board.id == Favorite.board_id)
+        .where(Favorite.user_id == current_user.id)
+        .order_by(Favorite.board_id)
+    ).all()
+
+    return jsonify({
+        "user": current_user.to_dict(),
+        "boards": [
+            {
+                **row.Board.to_dict_basic(),
+                "sectionCount": row.section_count,
+                "cardCount": row.card_count,
+                "isFavorite": bool(row.is_favorite),
+            }
+            for row in rows
+        ],
+        "next": next_cursor,
+        "favorites": [
+            {**row.Favorite.to_dict_basic(), "Board": row.Board.to_dict_basic()}
+            for row in favorites
+        ],
+        "favoriteBoardIds": [row.Favorite.board_id for row in favorites],
+    })
@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify
+from threading import Thread
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
-from app.models import Card, db
+from app.models import BoardChange, Card, CardSection, db, record_board_changes
+from app.models.db import run_after_commit
+from app.models.rank import rank_after, rank_between, rank_for_position, needs_rebalance
 from app.forms import CardForm
+from sqlalchemy import and_, bindparam, func, literal, null, select, union_all, update
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -9,15 +13,21 @@ from sqlalchemy.exc import SQLAlchemyError
 cards_api = Blueprint("cards", __name__)
 
 
-def verify_card_ownership(card_instance, user_id):
-    """Helper function to verify card ownership"""
-    if not card_instance:
-        return {"error": "Card not found", "status": 404}
+def verify_card_ownership(card_id, user_id):
+    """
+    Helper function to verify card ownership
+    Returns tuple of (card_object, error_response)
+    """
+    # Single indexed lookup on id and owner
+    card = Card.get_owned(card_id, user_id)
+    if card:
+        return card, None
 
-    if card_instance.to_dict_basic()["userId"] != user_id:
-        return {"error": "Forbidden - You do not own this card", "status": 403}
+    # Only the failure path pays for telling missing and foreign cards apart
+    if not db.session.query(Card.id).filter(Card.id == card_id).first():
+        return None, ({"error": "Card not found"}, 404)
 
-    return None
+    return None, ({"error": "Forbidden - You do not own this card"}, 403)
 
 
 @cards_api.route("/<int:card_id>", methods=["PUT"])
@@ -25,13 +35,10 @@ def verify_card_ownership(card_instance, user_id):
 def update_card(card_id):
     """Update a card if the current user is the owner"""
 
-    # Find card by ID
-    target_card = Card.query.get(card_id)
-
     # Check if card exists and belongs to user
-    ownership_check = verify_card_ownership(target_card, current_user.id)
-    if ownership_check:
-        return ownership_check["error"], ownership_check["status"]
+    target_card, error = verify_card_ownership(card_id, current_user.id)
+    if error:
+        return jsonify(error[0]), error[1]
 
     # Process the form data
     card_form = CardForm()
@@ -62,13 +69,10 @@ def update_card(card_id):
 def remove_card(card_id):
     """Remove a card if the current user is the owner"""
 
-    # Find the card by ID
-    target_card = Card.query.get(card_id)
-
     # Check if card exists and belongs to user
-    error_response = verify_card_ownership(target_card, current_user.id)
-    if error_response:
-        return jsonify(error_response[0]), error_response[1]
+    target_card, error = verify_card_ownership(card_id, current_user.id)
+    if error:
+        return jsonify(error[0]), error[1]
 
     try:
         # Delete the card
@@ -80,71 +84,302 @@ def remove_card(card_id):
         return jsonify({"error": "Database error", "message": "Failed to delete card"}), 500
 
 
+def load_reorder_targets(card_ids, section_ids):
+    """
+    Fetches the current state of the cards being reordered and the owners of
+    their destination sections in one round trip
+    Returns tuple of (card_rows_by_id, section_owner_by_id)
+    """
+    card_rows = select(
+        literal("card").label("kind"),
+        Card.id,
+        Card.owner_id,
+        Card.order,
+        Card.rank,
+        Card.card_section_id,
+    ).where(Card.id.in_(card_ids))
+
+    section_rows = select(
+        literal("section").label("kind"),
+        CardSection.id,
+        CardSection.owner_id,
+        null(),
+        null(),
+        null(),
+    ).where(CardSection.id.in_(section_ids))
+
+    cards, section_owners = {}, {}
+    for row in db.session.execute(union_all(card_rows, section_rows)):
+        if row.kind == "card":
+            cards[row.id] = row
+        else:
+            section_owners[row.id] = row.owner_id
+
+    return cards, section_owners
+
+
+def apply_card_order(changed_rows, previous_section_ids):
+    """
+    Writes new order/section values with a single executemany UPDATE
+    and records the moves in the board change log
+    """
+    cards_table = Card.__table__
+    db.session.execute(
+        update(cards_table)
+        .where(cards_table.c.id == bindparam("card_id"))
+        .values(
+            order=bindparam("new_order"),
+            rank=bindparam("new_rank"),
+            card_section_id=bindparam("new_section_id"),
+        ),
+        [
+            {**row, "new_rank": rank_for_position(row["new_order"])}
+            for row in changed_rows
+        ],
+    )
+
+    changes = []
+    for row in changed_rows:
+        previous_section_id = previous_section_ids[row["card_id"]]
+        if previous_section_id != row["new_section_id"]:
+            changes.append((BoardChange.ENTITY_CARD, row["card_id"], BoardChange.OP_DELETE, previous_section_id, None))
+        changes.append((BoardChange.ENTITY_CARD, row["card_id"], BoardChange.OP_UPSERT, row["new_section_id"], None))
+    record_board_changes(db.session.connection(), changes)
+
+
+def rebalance_section_ranks(section_id):
+    """
+    Rewrites a section's ranks as evenly spaced keys, and its orders as the
+    matching positions, in one executemany UPDATE
+    """
+    card_ids = db.session.scalars(
+        select(Card.id)
+        .where(Card.card_section_id == section_id)
+        .order_by(Card.rank, Card.id)
+    ).all()
+
+    if card_ids:
+        cards_table = Card.__table__
+        db.session.execute(
+            update(cards_table)
+            .where(cards_table.c.id == bindparam("card_id"))
+            .values(order=bindparam("new_order"), rank=bindparam("new_rank")),
+            [
+                {"card_id": card_id, "new_order": position, "new_rank": rank_for_position(position)}
+                for position, card_id in enumerate(card_ids)
+            ],
+        )
+        record_board_changes(db.session.connection(), [
+            (BoardChange.ENTITY_CARD, card_id, BoardChange.OP_UPSERT, section_id, None)
+            for card_id in card_ids
+        ])
+    db.session.commit()
+
+
+def schedule_rank_rebalance(section_id):
+    """Runs rebalance_section_ranks off the request thread"""
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                rebalance_section_ranks(section_id)
+            except SQLAlchemyError:
+                db.session.rollback()
+                app.logger.exception("Rank rebalance failed for section %s", section_id)
+
+    Thread(target=run, daemon=True).start()
+
+
+def load_move_neighbours(card, before_id, after_id, section_id):
+    """
+    Resolves the rank window a card should be moved into
+    section_id is only used when no neighbour is given
+    Returns tuple of (section_id, low_rank, high_rank, error_response)
+    """
+    neighbour_ids = [card_id for card_id in (before_id, after_id) if card_id is not None]
+    neighbours = {
+        row.id: row
+        for row in db.session.execute(
+            select(Card.id, Card.rank, Card.card_section_id, Card.owner_id)
+            .where(Card.id.in_(neighbour_ids))
+        )
+    } if neighbour_ids else {}
+
+    for card_id in neighbour_ids:
+        if card_id not in neighbours:
+            return None, None, None, ({"error": "Not found", "message": f"Card with id {card_id} not found"}, 404)
+        if neighbours[card_id].owner_id != current_user.id:
+            return None, None, None, ({"error": "Forbidden", "message": "You do not have permission to move next to this card"}, 403)
+        if card_id == card.id:
+            return None, None, None, ({"error": "Invalid move", "message": "A card cannot be moved next to itself"}, 400)
+
+    section_ids = {row.card_section_id for row in neighbours.values()}
+    if len(section_ids) > 1:
+        return None, None, None, ({"error": "Invalid move", "message": "beforeId and afterId must be in the same section"}, 400)
+
+    def others_in_section(section_id):
+        return and_(Card.card_section_id == section_id, Card.id != card.id)
+
+    # Neighbour ranks come from the request, the open side from the index
+    if before_id is not None and after_id is not None:
+        return section_ids.pop(), neighbours[after_id].rank, neighbours[before_id].rank, None
+
+    if after_id is not None:
+        section_id, low = section_ids.pop(), neighbours[after_id].rank
+        high = db.session.scalar(
+            select(func.min(Card.rank)).where(others_in_section(section_id), Card.rank > low)
+        )
+        return section_id, low, high, None
+
+    if before_id is not None:
+        section_id, high = section_ids.pop(), neighbours[before_id].rank
+        low = db.session.scalar(
+            select(func.max(Card.rank)).where(others_in_section(section_id), Card.rank < high)
+        )
+        return section_id, low, high, None
+
+    # No neighbours: append to the end of the requested (or current) section
+    if section_id != card.card_section_id and not CardSection.get_owned(section_id, current_user.id):
+        return None, None, None, ({"error": "Not found", "message": f"Section with id {section_id} not found"}, 404)
+
+    low = db.session.scalar(select(func.max(Card.rank)).where(others_in_section(section_id)))
+    return section_id, low, None, None
+
+
+@cards_api.route("/<int:card_id>/move", methods=["POST"])
+@login_required
+def move_card(card_id):
+    """
+    Move a single card by rank, writing only that card's row
+    Accepts beforeId (place the card before this card), afterId (place the
+    card after this card), or neither with an optional cardSectionId to
+    append to the end of a section
+    """
+    request_data = request.get_json() or {}
+
+    # Ensure CSRF token is present
+    if "csrf_token" not in request.cookies:
+        return jsonify({"error": "CSRF token missing"}), 400
+
+    before_id = request_data.get("beforeId")
+    after_id = request_data.get("afterId")
+    section_id = request_data.get("cardSectionId")
+    if not all(value is None or isinstance(value, int) for value in (before_id, after_id, section_id)):
+        return jsonify({"error": "Invalid type", "message": "beforeId, afterId and cardSectionId must be integers"}), 400
+
+    # Check if card exists and belongs to user
+    target_card, error = verify_card_ownership(card_id, current_user.id)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    section_id, low, high, error = load_move_neighbours(
+        target_card, before_id, after_id, section_id or target_card.card_section_id
+    )
+    if error:
+        return jsonify(error[0]), error[1]
+
+    if low is not None and high is not None and low > high:
+        return jsonify({"error": "Invalid move", "message": "afterId must come before beforeId"}), 400
+
+    try:
+        new_rank = rank_after(low) if high is None else rank_between(low, high)
+    except ValueError:
+        # Duplicate ranks left by older bulk reorders; fix the section and let the client retry
+        schedule_rank_rebalance(section_id)
+        return jsonify({"error": "Conflict", "message": "Section is being rebalanced, please retry"}), 409
+
+    try:
+        target_card.rank = new_rank
+        # The card's position is only known relative to its neighbours now;
+        # a stale order would make a later bulk reorder look like a no-op
+        target_card.order = None
+        target_card.card_section_id = section_id
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return jsonify({"error": "Database error", "message": "Failed to move card"}), 500
+
+    if needs_rebalance(new_rank):
+        # Inside an atomic batch the move is not committed yet
+        run_after_commit(lambda: schedule_rank_rebalance(section_id))
+
+    return jsonify(target_card.to_dict_basic())
+
+
 @cards_api.route("/reorder", methods=["PUT"])
 @login_required
 def update_card_order():
     """Update the order and section of multiple cards"""
     # Get JSON data from request
     request_data = request.get_json()
-    
+
     # Ensure CSRF token is present
     if 'csrf_token' not in request.cookies:
         return jsonify({"error": "CSRF token missing"}), 400
-        
+
     cards_to_reorder = request_data.get("reorderedCards", [])
 
     # Validate data structure
     if not isinstance(cards_to_reorder, list):
         return jsonify({"error": "Invalid format", "message": "Data must be a list of cards"}), 400
 
-    # Collect all card IDs to verify ownership
-    card_ids = [card_data.get('id') for card_data in cards_to_reorder if 'id' in card_data]
-    
-    # Verify user has access to all cards
-    cards_from_db = Card.query.filter(Card.id.in_(card_ids)).all()
-    
-    # Create a map for quick lookup
-    card_map = {card.id: card for card in cards_from_db}
-    
-    # Check if all cards exist and belong to user
-    for card_id in card_ids:
-        if card_id not in card_map:
+    # Validate every entry before touching the database
+    required_fields = ["id", "order", "cardSectionId"]
+    for card_data in cards_to_reorder:
+        if not isinstance(card_data, dict) or not all(field in card_data for field in required_fields):
+            return jsonify({
+                "error": "Missing data",
+                "message": f"Missing required fields in card: {card_data}",
+                "required_fields": required_fields
+            }), 400
+
+        if not all(isinstance(card_data[field], int) for field in required_fields):
+            return jsonify({"error": "Invalid type", "message": f"Invalid data types in card: {card_data}"}), 400
+
+    # Last entry wins if a card is listed twice
+    new_positions = {
+        card_data["id"]: (card_data["order"], card_data["cardSectionId"])
+        for card_data in cards_to_reorder
+    }
+    if not new_positions:
+        return jsonify({"message": "Cards reordered successfully", "cards": cards_to_reorder})
+
+    # Verify ownership of all cards and destination sections in one query
+    destination_ids = {section_id for _, section_id in new_positions.values()}
+    current_cards, section_owners = load_reorder_targets(list(new_positions), list(destination_ids))
+
+    for card_id in new_positions:
+        if card_id not in current_cards:
             return jsonify({"error": "Not found", "message": f"Card with id {card_id} not found"}), 404
-        
-        if card_map[card_id].to_dict_basic()["userId"] != current_user.id:
+
+        if current_cards[card_id].owner_id != current_user.id:
             return jsonify({"error": "Forbidden", "message": "You do not have permission to update some cards"}), 403
 
-    try:
-        # Start a transaction
-        db.session.begin_nested()
-        
-        # Process each card in the reorder list
-        for card_data in cards_to_reorder:
-            # Validate required fields
-            required_fields = ["id", "order", "cardSectionId"]
-            if not all(field in card_data for field in required_fields):
-                db.session.rollback()
-                return jsonify({
-                    "error": "Missing data", 
-                    "message": f"Missing required fields in card: {card_data}",
-                    "required_fields": required_fields
-                }), 400
-
-            # Validate data types
-            if not isinstance(card_data["id"], int) or not isinstance(card_data["order"], int):
-                db.session.rollback()
-                return jsonify({"error": "Invalid type", "message": f"Invalid data types in card: {card_data}"}), 400
+    for section_id in destination_ids:
+        if section_id not in section_owners:
+            return jsonify({"error": "Not found", "message": f"Section with id {section_id} not found"}), 404
 
-            # Update card in database
-            db_card = card_map.get(card_data["id"])
-            if db_card:
-                db_card.order = card_data["order"]
-                db_card.card_section_id = card_data["cardSectionId"]
+        if section_owners[section_id] != current_user.id:
+            return jsonify({"error": "Forbidden", "message": "You do not have permission to move cards to this section"}), 403
 
-        # Commit all changes at once
-        db.session.commit()
+    # Only write rows whose order, rank or section actually changed. The rank
+    # is compared too: single-card moves and imports rewrite it on their own.
+    changed_rows = [
+        {"card_id": card_id, "new_order": new_order, "new_section_id": new_section_id}
+        for card_id, (new_order, new_section_id) in new_positions.items()
+        if (current_cards[card_id].order, current_cards[card_id].rank, current_cards[card_id].card_section_id)
+        != (new_order, rank_for_position(new_order), new_section_id)
+    ]
+
+    try:
+        if changed_rows:
+            apply_card_order(changed_rows, {
+                card_id: row.card_section_id for card_id, row in current_cards.items()
+            })
+            db.session.commit()
         return jsonify({"message": "Cards reordered successfully", "cards": cards_to_reorder})
-    
-    except SQLAlchemyError as e:
+
+    except SQLAlchemyError:
         db.session.rollback()
-        return jsonify({"error": "Database error", "message": "Failed to reorder cards"}), 500
\ No newline at end of file
+        return jsonify({"error": "Database error", "message": "Failed to reorder cards"}), 500
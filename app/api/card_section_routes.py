@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from app.models import CardSection, Card, db
+from app.models.rank import rank_after, rank_for_position
 from app.forms import CardSectionForm, CardForm
+from app.api.pagination import keyset_page, page_args
+from sqlalchemy import func, select
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -14,26 +17,23 @@ def validate_section_access(section_id):
     Helper function to validate section existence and user access
     Returns tuple of (section_object, error_response)
     """
-    # Find the section
-    section = CardSection.query.get(section_id)
+    # Single indexed lookup on id and owner
+    section = CardSection.get_owned(section_id, current_user.id)
+    if section:
+        return section, None
 
     # Check if section exists
-    if not section:
+    if not db.session.query(CardSection.id).filter(CardSection.id == section_id).first():
         return None, ({"error": "Not Found", "message": "Section not found"}, 404)
 
-    # Check ownership
-    board_owner_id = section.board.user_id
-    if board_owner_id != current_user.id:
-        return None, (
-            {
-                "error": "Forbidden",
-                "message": "You don't have permission to access this section",
-            },
-            403,
-        )
-
-    # Section exists and user has access
-    return section, None
+    # Section exists but belongs to someone else
+    return None, (
+        {
+            "error": "Forbidden",
+            "message": "You don't have permission to access this section",
+        },
+        403,
+    )
 
 
 @section_api.route("/<int:section_id>", methods=["PUT"])
@@ -94,14 +94,26 @@ def remove_section(section_id):
 @section_api.route("/<int:section_id>/cards")
 @login_required
 def list_section_cards(section_id):
-    """Retrieve all cards in a section"""
+    """Retrieve the cards in a section in rank order, one keyset page at a time"""
+    limit, after, error = page_args(key_types=(str, int))
+    if error:
+        return jsonify(error[0]), error[1]
+
     # Validate access
     section, error = validate_section_access(section_id)
     if error:
         return jsonify(error[0]), error[1]
 
+    # Page along the (card_section_id, rank) index
+    cards, next_cursor = keyset_page(
+        Card.query.filter(Card.card_section_id == section.id),
+        [Card.rank, Card.id],
+        limit,
+        after,
+    )
+
     # Return cards data
-    return jsonify({"cards": section.to_dict_card()["Cards"]})
+    return jsonify({"cards": [card.to_dict_basic() for card in cards], "next": next_cursor})
 
 
 @section_api.route("/<int:section_id>/cards", methods=["POST"])
@@ -119,35 +131,32 @@ def add_card_to_section(section_id):
 
     if form.validate_on_submit():
         try:
-            # Begin a transaction
-            db.session.begin_nested()
+            # Current end of the section in one indexed lookup
+            highest_order, highest_rank = db.session.execute(
+                select(func.max(Card.order), func.max(Card.rank)).where(
+                    Card.card_section_id == section_id
+                )
+            ).one()
 
             # Determine card order
             order_value = form.data["order"]
             if not order_value:
                 # Auto-calculate order if not provided
-                existing_cards = Card.query.filter_by(card_section_id=section_id).all()
-
-                if not existing_cards:
-                    order_value = 0
-                else:
-                    # Get highest order value and increment
-                    highest_order = (
-                        Card.query.filter_by(card_section_id=section_id)
-                        .order_by(Card.order.desc())
-                        .first()
-                        .order
-                    )
-                    order_value = highest_order + 1
+                order_value = 0 if highest_order is None else highest_order + 1
+                rank_value = rank_after(highest_rank)
+            else:
+                rank_value = rank_for_position(order_value)
 
             # Create card
             card = Card(
                 card_section_id=section_id,
+                owner_id=section.owner_id,
                 name=form.data["name"],
                 description=form.data["description"],
                 labels=form.data["labels"],
                 due_date=form.data["due_date"],
                 order=order_value,
+                rank=rank_value,
             )
 
             # Save to database
@@ -0,0 +1,23 @@
+from flask import current_app, request
+
+
+def make_etag(*parts):
+    """Builds an ETag value from version parts, e.g. ("board", 3, 12)"""
+    return "-".join(str(part) for part in parts)
+
+
+def not_modified(etag):
+    """
+    Returns an empty 304 response if the client already holds `etag`,
+    otherwise None so the route can build the full response
+    """
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(current_app.response_class(status=304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Tags a response so the browser revalidates it on every fetch"""
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -1,7 +1,12 @@
+from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from app.models import Favorite, Board, db
-from sqlalchemy import and_
+from app.models.db import insert_ignoring_duplicates
+from app.api.etag_utils import make_etag, not_modified, with_etag
+from app.api.pagination import keyset_page, next_link, page_args
+from sqlalchemy import and_, delete, func, literal, select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
 
 # Initialize blueprint
@@ -12,16 +17,42 @@ favorites_api = Blueprint("favorites", __name__)
 @login_required
 def get_favorites():
     """
-    Retrieve all favorite boards for the authenticated user
-    Returns a list of board data through the favorites relationship
+    Retrieve favorite boards for the authenticated user, one keyset page at a time
+    Returns a list of board data through the favorites relationship,
+    with a Link rel="next" header when more pages follow
     """
-    # Query all favorites for the current user
-    user_favorites = Favorite.query.filter(Favorite.user_id == current_user.id).all()
+    limit, after, error = page_args(key_types=(int,))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    # Cheap fingerprint of the favorites list and the boards it shows
+    favorite_count, last_favorite_id, board_revisions = db.session.execute(
+        select(func.count(Favorite.id), func.max(Favorite.id), func.sum(Board.revision))
+        .join(Board, Board.id == Favorite.board_id)
+        .where(Favorite.user_id == current_user.id)
+    ).one()
+    etag = make_etag("favorites", current_user.id, favorite_count, last_favorite_id, board_revisions)
+    unchanged = not_modified(etag)
+    if unchanged:
+        return unchanged
+
+    # Page through favorites along the (user_id, board_id) unique index,
+    # with each favorite's board joined into the same query
+    user_favorites, next_cursor = keyset_page(
+        Favorite.query.filter(Favorite.user_id == current_user.id)
+        .options(joinedload(Favorite.board, innerjoin=True)),
+        [Favorite.board_id],
+        limit,
+        after,
+    )
 
     # Transform to dictionary representation
     favorite_data = [favorite.to_dict_board() for favorite in user_favorites]
 
-    return jsonify(favorite_data)
+    response = with_etag(jsonify(favorite_data), etag)
+    if next_cursor:
+        response.headers["Link"] = next_link(next_cursor, limit)
+    return response
 
 
 @favorites_api.route("", methods=["POST"])
@@ -30,27 +61,63 @@ def add_favorite():
     """
     Add a board to user's favorites
     Requires board_id in the request JSON
+    Idempotent: 201 when the favorite is created, 200 when it already existed
     """
     # Extract board ID from request
-    request_data = request.get_json()
+    request_data = request.get_json(silent=True) or {}
 
     # Ensure CSRF token is present
     if "csrf_token" not in request.cookies:
         return jsonify({"error": "CSRF token missing"}), 400
 
     target_board_id = request_data.get("board_id")
-
-    # Validate input
-    if not target_board_id:
+    # The board page sends the id from the URL, as a string
+    if isinstance(target_board_id, str) and target_board_id.isascii() and target_board_id.isdigit():
+        target_board_id = int(target_board_id)
+
+    # Validate input; larger ids cannot be bound on SQLite
+    if (
+        not isinstance(target_board_id, int) or isinstance(target_board_id, bool)
+        or not 0 < target_board_id < 2**63
+    ):
         return jsonify({"error": "Bad Request", "message": "board_id is required"}), 400
 
-    # Validate board exists
-    target_board = Board.query.get(target_board_id)
-    if not target_board:
+    # Read before the commit, which expires the user
+    user_id = current_user.id
+
+    try:
+        # One statement: inserts only for the user's own board, and the
+        # (user_id, board_id) unique constraint turns a concurrent or
+        # repeated add into a no-op instead of a duplicate
+        now = datetime.now(timezone.utc)
+        result = db.session.execute(
+            insert_ignoring_duplicates(Favorite.__table__)
+            .from_select(
+                ["user_id", "board_id", "created_at", "updated_at"],
+                select(literal(user_id), Board.id, literal(now), literal(now))
+                .where(Board.id == target_board_id, Board.user_id == user_id),
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "board_id"])
+        )
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return (
+            jsonify({"error": "Database error", "message": "Failed to add favorite"}),
+            500,
+        )
+
+    # Board and favorite in one query, also telling a missing board from someone else's
+    row = db.session.execute(
+        select(Board, Favorite)
+        .outerjoin(Favorite, and_(Favorite.board_id == Board.id, Favorite.user_id == user_id))
+        .where(Board.id == target_board_id)
+    ).first()
+    if row is None:
         return jsonify({"error": "Not Found", "message": "Board not found"}), 404
 
     # Verify user has access to board
-    if target_board.user_id != current_user.id:
+    if row.Board.user_id != user_id or row.Favorite is None:
         return (
             jsonify(
                 {
@@ -61,34 +128,9 @@ def add_favorite():
             403,
         )
 
-    # Check if favorite already
-    existing_favorite = Favorite.query.filter(
-        and_(Favorite.board_id == target_board_id, Favorite.user_id == current_user.id)
-    ).first()
-
-    if existing_favorite:
-        return (
-            jsonify(
-                {"error": "Conflict", "message": "Board is already in your favorites"}
-            ),
-            409,
-        )
-
-    try:
-        # Create new favorite
-        favorite = Favorite(user_id=current_user.id, board_id=target_board_id)
-
-        # Save to database
-        db.session.add(favorite)
-        db.session.commit()
-
-        return jsonify(favorite.to_dict_board()), 201
-    except SQLAlchemyError:
-        db.session.rollback()
-        return (
-            jsonify({"error": "Database error", "message": "Failed to add favorite"}),
-            500,
-        )
+    return jsonify({**row.Favorite.to_dict_basic(), "Board": row.Board.to_dict_basic()}), (
+        201 if result.rowcount else 200
+    )
 
 
 @favorites_api.route("/<int:favorite_id>", methods=["DELETE"])
@@ -101,31 +143,12 @@ def remove_favorite(favorite_id):
     if "csrf_token" not in request.cookies:
         return jsonify({"error": "CSRF token missing"}), 400
 
-    # Find the favorite
-    favorite = Favorite.query.get(favorite_id)
-
-    # Validate favorite exists
-    if not favorite:
-        return jsonify({"error": "Not Found", "message": "Favorite not found"}), 404
-
-    # Verify ownership
-    if favorite.user_id != current_user.id:
-        return (
-            jsonify(
-                {
-                    "error": "Forbidden",
-                    "message": "You don't have permission to remove this favorite",
-                }
-            ),
-            403,
-        )
-
     try:
-        # Remove favorite
-        db.session.delete(favorite)
+        # Only deletes the favorite if it belongs to the current user
+        result = db.session.execute(
+            delete(Favorite).where(Favorite.id == favorite_id, Favorite.user_id == current_user.id)
+        )
         db.session.commit()
-
-        return jsonify({"message": "Favorite successfully removed"})
     except SQLAlchemyError:
         db.session.rollback()
         return (
@@ -134,3 +157,19 @@ def remove_favorite(favorite_id):
             ),
             500,
         )
+
+    if result.rowcount:
+        return jsonify({"message": "Favorite successfully removed"})
+
+    # Nothing deleted: tell a missing favorite from someone else's
+    if db.session.get(Favorite, favorite_id) is None:
+        return jsonify({"error": "Not Found", "message": "Favorite not found"}), 404
+    return (
+        jsonify(
+            {
+                "error": "Forbidden",
+                "message": "You don't have permission to remove this favorite",
+            }
+        ),
+        403,
+    )
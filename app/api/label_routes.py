@@ -0,0 +1,214 @@
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+from app.models import BoardChange, Card, CardSection, Label, card_labels, db, record_board_changes
+from app.models.label import MAX_LABEL_LENGTH, clean_label_name, format_labels, parse_labels
+from app.api.pagination import encode_cursor, page_args
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+# Initialize blueprint
+labels_api = Blueprint("labels", __name__)
+
+# Most labels a single card filter may combine
+MAX_FILTER_LABELS = 10
+# Length of the cards.labels column the names are also written to
+MAX_LABELS_LENGTH = Card.__table__.c.labels.type.length
+
+
+def verify_label_ownership(label_id, user_id):
+    """
+    Helper function to verify label ownership
+    Returns tuple of (label_object, error_response)
+    """
+    label = db.session.get(Label, label_id)
+    if not label:
+        return None, ({"error": "Label not found"}, 404)
+    if label.owner_id != user_id:
+        return None, ({"error": "Forbidden - You do not own this label"}, 403)
+    return label, None
+
+
+@labels_api.route("")
+@login_required
+def get_labels():
+    """The current user's labels with the number of cards carrying each"""
+    rows = db.session.execute(
+        select(Label, func.count(card_labels.c.card_id).label("card_count"))
+        .outerjoin(card_labels, card_labels.c.label_id == Label.id)
+        .where(Label.owner_id == current_user.id)
+        .group_by(Label.id)
+        .order_by(Label.name)
+    ).all()
+
+    return jsonify({
+        "labels": [{**row.Label.to_dict_basic(), "cardCount": row.card_count} for row in rows]
+    })
+
+
+@labels_api.route("/cards")
+@login_required
+def get_labelled_cards():
+    """
+    Cards across all of the current user's boards carrying the given labels,
+    one keyset page at a time. ?label= may repeat; ?match=all (the default)
+    requires every label, ?match=any at least one.
+    """
+    names = list(dict.fromkeys(
+        clean_label_name(name) for name in request.args.getlist("label") if name.strip()
+    ))
+    if not names:
+        return jsonify({"error": "Bad Request", "message": "label is required"}), 400
+    if len(names) > MAX_FILTER_LABELS:
+        return jsonify({"error": "Bad Request", "message": f"At most {MAX_FILTER_LABELS} labels can be combined"}), 400
+
+    match = request.args.get("match", "all")
+    if match not in ("all", "any"):
+        return jsonify({"error": "Bad Request", "message": "match must be all or any"}), 400
+
+    limit, after, error = page_args(key_types=(int,))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    # Card ids straight off the (label_id, card_id) index
+    labelled = (
+        select(card_labels.c.card_id)
+        .join(Label, Label.id == card_labels.c.label_id)
+        .where(Label.owner_id == current_user.id, Label.name.in_(names))
+    )
+    if match == "all":
+        labelled = labelled.group_by(card_labels.c.card_id).having(func.count() == len(names))
+
+    query = (
+        db.session.query(Card, CardSection.board_id)
+        .join(CardSection, CardSection.id == Card.card_section_id)
+        .filter(Card.owner_id == current_user.id, Card.id.in_(labelled))
+    )
+    if after is not None:
+        query = query.filter(Card.id > after[0])
+    rows = query.order_by(Card.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].Card.id])
+
+    return jsonify({
+        "cards": [
+            {**row.Card.to_dict_basic(), "boardId": row.board_id}
+            for row in rows
+        ],
+        "next": next_cursor,
+    })
+
+
+def renamed_card_labels(card_rows, old_name, new_name):
+    """New labels strings of the given cards, by card id, with the label name swapped"""
+    return {
+        # A merge can leave the target name twice on a card
+        row.id: format_labels(dict.fromkeys(
+            new_name if name == old_name else name for name in parse_labels(row.labels)
+        ))
+        for row in card_rows
+    }
+
+
+def rewrite_card_labels(card_rows, new_labels):
+    """
+    Writes the given labels strings with a single executemany UPDATE and
+    records the cards in the board change log. card_labels is left alone:
+    the caller has already re-pointed it.
+    """
+    cards_table = Card.__table__
+    db.session.execute(
+        update(cards_table)
+        .where(cards_table.c.id == bindparam("card_id"))
+        .values(labels=bindparam("new_labels")),
+        [{"card_id": row.id, "new_labels": new_labels[row.id]} for row in card_rows],
+    )
+    record_board_changes(db.session.connection(), [
+        (BoardChange.ENTITY_CARD, row.id, BoardChange.OP_UPSERT, row.card_section_id, None)
+        for row in card_rows
+    ])
+
+
+@labels_api.route("/<int:label_id>", methods=["PUT"])
+@login_required
+def rename_label(label_id):
+    """
+    Rename a label on every card carrying it. Renaming to the name of
+    another of the user's labels merges the two.
+    """
+    # Ensure CSRF token is present
+    if "csrf_token" not in request.cookies:
+        return jsonify({"error": "CSRF token missing"}), 400
+
+    request_data = request.get_json(silent=True) or {}
+    name = request_data.get("name")
+    name = " ".join(name.split()) if isinstance(name, str) else ""
+    if not name or "," in name or len(name) > MAX_LABEL_LENGTH:
+        return jsonify({
+            "error": "Bad Request",
+            "message": f"name is required, without commas, {MAX_LABEL_LENGTH} characters max",
+        }), 400
+
+    label, error = verify_label_ownership(label_id, current_user.id)
+    if error:
+        return jsonify(error[0]), error[1]
+
+    old_name = label.name
+    if name == old_name:
+        return jsonify(label.to_dict_basic())
+
+    try:
+        card_rows = db.session.execute(
+            select(Card.id, Card.card_section_id, Card.labels)
+            .join(card_labels, card_labels.c.card_id == Card.id)
+            .where(card_labels.c.label_id == label.id)
+        ).all()
+
+        # A longer name must still fit every card's labels column
+        new_labels = renamed_card_labels(card_rows, old_name, name)
+        too_long = [card_id for card_id, labels in new_labels.items() if len(labels) > MAX_LABELS_LENGTH]
+        if too_long:
+            db.session.rollback()
+            return jsonify({
+                "error": "Bad Request",
+                "message": f"The new name would make the labels of cards {too_long[:10]} longer than "
+                           f"{MAX_LABELS_LENGTH} characters",
+            }), 400
+
+        target = Label.query.filter(
+            Label.owner_id == current_user.id, Label.name == name, Label.id != label.id
+        ).first()
+        if target is None:
+            # One row: every card carrying the label follows it
+            label.name = name
+            result = label
+        else:
+            # Merge: move all links over in one UPDATE, skipping cards that
+            # already carry the target, then drop what is left of the label
+            db.session.execute(
+                update(card_labels)
+                .where(
+                    card_labels.c.label_id == label.id,
+                    card_labels.c.card_id.not_in(
+                        select(card_labels.c.card_id).where(card_labels.c.label_id == target.id)
+                    ),
+                )
+                .values(label_id=target.id)
+            )
+            db.session.execute(delete(card_labels).where(card_labels.c.label_id == label.id))
+            db.session.delete(label)
+            result = target
+
+        if card_rows:
+            rewrite_card_labels(card_rows, new_labels)
+        db.session.commit()
+        return jsonify(result.to_dict_basic())
+    except IntegrityError:
+        # Another request took the name first
+        db.session.rollback()
+        return jsonify({"error": "Conflict", "message": "A label with this name was just created, please retry"}), 409
+    except SQLAlchemyError:
+        db.session.rollback()
+        return jsonify({"error": "Database error", "message": "Failed to rename label"}), 500
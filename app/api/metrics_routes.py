@@ -0,0 +1,30 @@
+import hmac
+from flask import Blueprint, current_app, jsonify, request
+from app import board_cache, identity_cache, password_hashing, pool_metrics, replica_routing, sql_metrics
+from app.models import db
+
+metrics_api = Blueprint("metrics", __name__)
+
+
+@metrics_api.route("")
+def get_metrics():
+    """
+    Aggregated runtime metrics for this worker process. They include slow
+    SQL text and pool internals, so the endpoint is off unless METRICS_TOKEN
+    is set, and then requires it as a bearer token.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    supplied = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+        return jsonify({"error": "Forbidden", "message": "A valid metrics token is required"}), 403
+
+    return jsonify({
+        "sql": sql_metrics.snapshot(),
+        "db_pool": pool_metrics.snapshot(db.engines),
+        "replicas": replica_routing.snapshot(),
+        "board_cache": board_cache.snapshot(),
+        "identity_cache": identity_cache.snapshot(),
+        "password_hashing": password_hashing.snapshot(),
+    })
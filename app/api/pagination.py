@@ -0,0 +1,85 @@
+import base64
+import json
+from urllib.parse import urlencode
+from flask import request
+from sqlalchemy import tuple_
+
+# Page size for clients that send no ?limit=
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key of the last row on a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def cursor_matches(values, key_types):
+    """True if decoded cursor values fit the sort key's column types"""
+    if not isinstance(values, list) or len(values) != len(key_types):
+        return False
+    for value, key_type in zip(values, key_types):
+        if isinstance(value, bool):
+            return False
+        # JSON writes whole floats like 2.0 as 2
+        if key_type is float and isinstance(value, int):
+            continue
+        if not isinstance(value, key_type):
+            return False
+        # Larger ints cannot be bound on SQLite
+        if key_type is int and not -2**63 <= value < 2**63:
+            return False
+    return True
+
+
+def page_args(key_types):
+    """
+    Reads ?limit= and ?after= from the request; key_types are the Python
+    types of the sort key columns, e.g. (int,) for an id
+    Returns tuple of (limit, after_values, error_response)
+    """
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return None, None, ({"error": "Bad Request", "message": f"limit must be between 1 and {MAX_PAGE_SIZE}"}, 400)
+
+    cursor = request.args.get("after")
+    if not cursor:
+        return limit, None, None
+
+    try:
+        after = decode_cursor(cursor)
+    except (ValueError, TypeError):
+        after = None
+    if not cursor_matches(after, key_types):
+        return None, None, ({"error": "Bad Request", "message": "Invalid cursor"}, 400)
+
+    return limit, after, None
+
+
+def keyset_page(query, key_columns, limit, after):
+    """
+    Applies keyset pagination to a query ordered by key_columns (which must
+    end with a unique column). Fetches one extra row to detect a next page.
+    Returns tuple of (rows, next_cursor)
+    """
+    if after is not None:
+        query = query.filter(tuple_(*key_columns) > tuple_(*after))
+    rows = query.order_by(*key_columns).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in key_columns])
+
+
+def next_link(cursor, limit):
+    """RFC 8288 Link header value for the next page of the current URL"""
+    args = {**request.args.to_dict(), "after": cursor, "limit": limit}
+    return f'<{request.base_url}?{urlencode(args)}>; rel="next"'
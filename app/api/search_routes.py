@@ -0,0 +1,118 @@
+import re
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+from app.models import Card, CardSection, db
+from app.api.pagination import encode_cursor, page_args
+from sqlalchemy import column, func, literal_column, select, table, tuple_
+
+search_api = Blueprint("search", __name__)
+
+# Longest accepted query, in words
+MAX_SEARCH_TERMS = 10
+# Only the user's most recent matches are ranked, so a very common term
+# costs the same as a rare one
+RANKED_CANDIDATES = 1000
+
+# SQLite FTS5 index over cards, maintained by triggers (see the search migration)
+cards_fts = table("cards_fts", column("rowid"))
+
+
+def search_terms(query):
+    """Words of the query; punctuation is dropped so it cannot become search syntax"""
+    return re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+
+
+def match_clause(terms):
+    """
+    Dialect specific match condition and score (lower is better) for cards
+    containing every term, the last one as a prefix. The row id is the
+    column the index returns matches in order of.
+    Returns tuple of (from_clause, condition, score, row_id)
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        tsquery = func.to_tsquery(
+            "english", " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        )
+        vector = literal_column(f"{Card.__table__.name}.search_vector")
+        return (
+            None,
+            vector.op("@@")(tsquery),
+            -func.ts_rank_cd(vector, tsquery),
+            Card.id,
+        )
+
+    fts_query = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+    return (
+        cards_fts,
+        literal_column("cards_fts").op("MATCH")(fts_query),
+        func.bm25(literal_column("cards_fts"), 10.0, 5.0, 1.0),
+        cards_fts.c.rowid,
+    )
+
+
+def ranking_cutoff(from_clause, condition, row_id):
+    """
+    Lowest card id among the user's RANKED_CANDIDATES newest matches, read
+    off the index in id order, or 0 when every match fits. Computed for the
+    first page only and carried in the cursor, so later pages rank the same
+    set of cards.
+    """
+    query = select(row_id).where(Card.owner_id == current_user.id, condition)
+    if from_clause is not None:
+        query = query.select_from(from_clause.join(Card, from_clause.c.rowid == Card.id))
+    # The last ranked match and the first one left out, if any
+    boundary = db.session.execute(
+        query.order_by(row_id.desc()).offset(RANKED_CANDIDATES - 1).limit(2)
+    ).scalars().all()
+    return boundary[0] if len(boundary) == 2 else 0
+
+
+@search_api.route("")
+@login_required
+def search_cards():
+    """
+    Full-text search over the current user's cards (name, labels and
+    description), best matches first, one keyset page at a time
+    """
+    terms = search_terms(request.args.get("q", ""))
+    if not terms:
+        return jsonify({"error": "Bad Request", "message": "q is required"}), 400
+
+    # The cursor carries the sort key and the ranking cutoff of the first page
+    limit, after, error = page_args(key_types=(float, int, int))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    from_clause, condition, score, row_id = match_clause(terms)
+
+    if after is None:
+        cutoff = ranking_cutoff(from_clause, condition, row_id)
+    else:
+        cutoff = after[2]
+
+    score = score.label("score")
+    query = db.session.query(Card, CardSection.board_id, score)
+    if from_clause is not None:
+        query = query.select_from(from_clause).join(Card, from_clause.c.rowid == Card.id)
+    query = (
+        query.join(CardSection, CardSection.id == Card.card_section_id)
+        .filter(Card.owner_id == current_user.id, condition, row_id >= cutoff)
+    )
+    if after is not None:
+        query = query.filter(tuple_(score, Card.id) > tuple_(*after[:2]))
+    rows = query.order_by(score, Card.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].score, rows[-1].Card.id, cutoff])
+
+    return jsonify({
+        "results": [
+            {**row.Card.to_dict_basic(), "boardId": row.board_id}
+            for row in rows
+        ],
+        "next": next_cursor,
+        # Older matches were left out of the ranking; a narrower query finds them
+        "truncated": cutoff > 0,
+    })
@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify
 from flask_login import login_required
 from app.models import User
+from app.api.pagination import keyset_page, page_args
 
 user_routes = Blueprint('users', __name__)
 
@@ -9,10 +10,15 @@ user_routes = Blueprint('users', __name__)
 @login_required
 def users():
     """
-    Query for all users and returns them in a list of user dictionaries
+    Query for users one keyset page at a time and returns them in a list of
+    user dictionaries, with a cursor for the next page
     """
-    users = User.query.all()
-    return {'users': [user.to_dict() for user in users]}
+    limit, after, error = page_args(key_types=(int,))
+    if error:
+        return jsonify(error[0]), error[1]
+
+    users, next_cursor = keyset_page(User.query, [User.id], limit, after)
+    return {'users': [user.to_dict() for user in users], 'next': next_cursor}
 
 
 @user_routes.route('/<int:id>')
@@ -0,0 +1,275 @@
+import http.cookiejar
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import time
+import timeit
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app, g
+from flask.cli import AppGroup
+from flask.json.provider import DefaultJSONProvider
+from flask_wtf.csrf import generate_csrf
+from .models import db, User
+from .json_provider import JSON_MIMETYPE, MSGPACK_MIMETYPE, msgpack, orjson
+from .sql_metrics import statement_count
+
+# Creates a benchmark group to hold our commands
+# So we can type `flask bench --help`
+bench_commands = AppGroup('bench')
+
+
+def board_payload(card_count, section_count=20):
+    """Synthetic Board.to_dict_detail() payload of the given size"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    per_section = card_count // section_count
+    return {
+        "id": 1,
+        "name": "Benchmark board",
+        "userId": 1,
+        "revision": 1,
+        "createdAt": now,
+        "updatedAt": now,
+        "CardSections": [
+            {
+                "id": section_id,
+                "title": f"Section {section_id}",
+                "boardId": 1,
+                "createdAt": now,
+                "updatedAt": now,
+                "userId": 1,
+                "Cards": [
+                    {
+                        "id": section_id * per_section + position,
+                        "name": f"Card {position}",
+                        "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+                        "labels": "High Priority, Documentation",
+                        "dueDate": now + timedelta(days=position % 30),
+                        "order": position,
+                        "rank": f"{position:06d}i",
+                        "cardSectionId": section_id,
+                        "createdAt": now,
+                        "updatedAt": now,
+                        "userId": 1,
+                    }
+                    for position in range(per_section)
+                ],
+            }
+            for section_id in range(section_count)
+        ],
+    }
+
+
+def report(name, seconds, runs, size):
+    print(f"{name:<22} {seconds / runs * 1000:8.2f} ms/encode {size / 1024:9.1f} KiB")
+
+
+# Creates the `flask bench serialization` command
+@bench_commands.command('serialization')
+@click.option('--cards', default=5000, help='Cards in the synthetic board')
+@click.option('--runs', default=20, help='Encodes per serializer')
+def serialization(cards, runs):
+    """Compares encode time of a board payload across serializers"""
+    payload = board_payload(cards)
+    stdlib = DefaultJSONProvider(current_app._get_current_object())
+    fast = current_app.json
+
+    candidates = [("stdlib json", lambda: stdlib.dumps(payload).encode())]
+    if orjson is not None:
+        candidates.append(("orjson", lambda: fast.serialize(payload, JSON_MIMETYPE)))
+    if msgpack is not None:
+        candidates.append(("msgpack", lambda: fast.serialize(payload, MSGPACK_MIMETYPE)))
+
+    print(f"Board with {cards} cards, {runs} runs each")
+    for name, encode in candidates:
+        size = len(encode())
+        report(name, timeit.timeit(encode, number=runs), runs, size)
+
+
+# Creates the `flask bench auth-queries` command
+@bench_commands.command('auth-queries')
+def auth_queries():
+    """Counts SQL statements issued per signup and login"""
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    username = email.split("@")[0]
+    credentials = {"email": email, "password": "benchmark-password"}
+    steps = [
+        ("signup", '/api/auth/signup', {
+            **credentials, "username": username, "confirm_password": "benchmark-password",
+        }),
+        ("signup duplicate", '/api/auth/signup', {
+            **credentials, "username": username, "confirm_password": "benchmark-password",
+        }),
+        ("login", '/api/auth/login', credentials),
+        ("login wrong password", '/api/auth/login', {**credentials, "password": "wrong-password"}),
+    ]
+    # One client for every step, flask_wtf keeps the CSRF token on g
+    client = current_app.test_client()
+    client.get('/api/auth/')
+    try:
+        for name, url, data in steps:
+            response = client.post(url, data=data)
+            print(f"{name:<22} {response.status_code} {statement_count(response):3d} queries")
+            # Log out so the next step does not load a session user
+            client.get('/api/auth/logout')
+    finally:
+        User.query.filter(User.email == email).delete()
+        db.session.commit()
+
+
+def issue_csrf_cookie_always(response):
+    # The previous inject_csrf_token: a signed token on every response.
+    # flask_wtf caches the token on g, which the CLI shares across requests;
+    # drop it so every response signs a token as it would in a worker.
+    g.pop(current_app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token'), None)
+    response.set_cookie('csrf_token', generate_csrf(), httponly=True)
+    return response
+
+
+# Creates the `flask bench csrf-cookie` command
+@bench_commands.command('csrf-cookie')
+@click.option('--requests', 'count', default=500, help='GETs per path and mode')
+def csrf_cookie(count):
+    """Compares GET throughput with the CSRF cookie issued always or only when needed"""
+    paths = ['/favicon.ico', '/index.html', '/api/auth/']
+    after_request = current_app.after_request_funcs.setdefault(None, [])
+    # The baseline swaps the app's conditional hook out, so only one of them runs
+    position = next(
+        index for index, hook in enumerate(after_request) if hook.__name__ == 'inject_csrf_token'
+    )
+    conditional_hook = after_request[position]
+
+    # One client for both modes, flask_wtf keeps the CSRF token on g
+    client = current_app.test_client()
+    client.get('/api/auth/')
+
+    print(f"{count} GETs per path")
+    for mode in ('always', 'conditional'):
+        if mode == 'always':
+            after_request[position] = issue_csrf_cookie_always
+        try:
+            for path in paths:
+                cookies = 0
+                started = time.perf_counter()
+                for _ in range(count):
+                    response = client.get(path)
+                    cookies += any(
+                        header.startswith('csrf_token=') for header in response.headers.getlist('Set-Cookie')
+                    )
+                elapsed = time.perf_counter() - started
+                print(f"{mode:<12} {path:<14} {count / elapsed:8.0f} req/s {cookies:5d} cookies issued")
+        finally:
+            if mode == 'always':
+                after_request[position] = conditional_hook
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))] if ordered else 0.0
+
+
+def wait_until_up(server, base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise click.ClickException(f"gunicorn exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(f"{base_url}/api/auth/", timeout=1)
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.2)
+            continue
+        return
+    raise click.ClickException(f"gunicorn did not start on {base_url}")
+
+
+def load_client(base_url, paths, deadline, latencies, errors):
+    """One simulated user: logs in as the demo user, then GETs paths until the deadline"""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    try:
+        opener.open(f"{base_url}/api/auth/", timeout=10)
+    except urllib.error.HTTPError:
+        pass
+    credentials = urllib.parse.urlencode({"email": "demo@aa.io", "password": "password"}).encode()
+    try:
+        opener.open(f"{base_url}/api/auth/login", data=credentials, timeout=30).read()
+    except OSError:
+        errors.append("/api/auth/login")
+        return
+
+    while time.monotonic() < deadline:
+        for path in paths:
+            started = time.perf_counter()
+            try:
+                opener.open(f"{base_url}{path}", timeout=30).read()
+            except OSError:
+                errors.append(path)
+            latencies.append(time.perf_counter() - started)
+
+
+# Creates the `flask bench load` command
+@bench_commands.command('load')
+@click.option('--worker-class', 'worker_classes', multiple=True,
+              default=['sync', 'gthread', 'gevent'], help='Worker models to compare')
+@click.option('--clients', default=16, help='Concurrent simulated users')
+@click.option('--duration', default=10, help='Seconds of load per worker model')
+@click.option('--port', default=8765, help='Port gunicorn listens on during the test')
+@click.option('--path', 'paths', multiple=True,
+              default=['/api/boards', '/api/boards/1', '/api/favorites'], help='GETs each user repeats')
+def load(worker_classes, clients, duration, port, paths):
+    """
+    Starts gunicorn with gunicorn.conf.py once per worker model, drives it
+    with concurrent logged-in users and reports throughput and latency.
+    Run against a seeded database; other settings come from the environment.
+    """
+    base_url = f"http://127.0.0.1:{port}"
+    root = os.path.dirname(current_app.root_path)
+
+    print(f"{clients} clients, {duration}s per worker model, GET {' '.join(paths)}")
+    for worker_class in worker_classes:
+        if worker_class == 'gevent' and importlib.util.find_spec('gevent') is None:
+            print(f"{worker_class:<8} skipped, gevent is not installed")
+            continue
+
+        env = {
+            **os.environ,
+            "GUNICORN_WORKER_CLASS": worker_class,
+            "PORT": str(port),
+            "GUNICORN_ACCESS_LOG": "",
+            "GUNICORN_LOG_LEVEL": "warning",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+            cwd=root, env=env, stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(server, base_url)
+            latencies, errors = [], []
+            deadline = time.monotonic() + duration
+            threads = [
+                threading.Thread(target=load_client, args=(base_url, paths, deadline, latencies, errors))
+                for _ in range(clients)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        print(
+            f"{worker_class:<8} {len(latencies) / elapsed:8.1f} req/s"
+            f"  p50 {percentile(latencies, 0.5) * 1000:7.1f} ms"
+            f"  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms"
+            f"  {len(errors)} errors"
+        )
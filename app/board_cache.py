@@ -0,0 +1,68 @@
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .local_cache import LocalCache
+
+
+# Serialized board payloads keyed by view, board id and board revision.
+# A board write bumps the revision, so stale entries can never be served;
+# invalidate() additionally frees them as soon as the write commits. After a
+# failed invalidation the revision in every key has still moved on.
+
+_cache = LocalCache("BOARD_CACHE")
+
+
+def init_app(app):
+    """Configures the board cache backend from app config"""
+    app.config.setdefault("BOARD_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    _cache.init_app(app, max_bytes=app.config["BOARD_CACHE_MAX_BYTES"])
+
+
+def lookup(view, board_id, revision):
+    """Cached payload bytes for a board view at a revision, or None"""
+    return _cache.get(f"{view}:{board_id}:{revision}")
+
+
+def store(view, board_id, revision, value):
+    _cache.set(f"{view}:{board_id}:{revision}", board_id, value)
+
+
+def invalidate(board_ids):
+    _cache.invalidate(board_ids)
+
+
+def cached_response(view, board, build_payload):
+    """
+    Serves a board view from the cache in the negotiated format, building
+    and storing it on a miss (build_payload is only called on a miss)
+    """
+    mimetype = current_app.json.negotiate()
+    cache_view = f"{view}:{mimetype}"
+    body = lookup(cache_view, board.id, board.revision)
+    if body is None:
+        body = current_app.json.serialize(build_payload(), mimetype)
+        store(cache_view, board.id, board.revision, body)
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.vary.add("Accept")
+    return response
+
+
+def snapshot():
+    return _cache.snapshot()
+
+
+# Boards written on a connection are invalidated once the transaction commits
+@event.listens_for(Engine, "commit")
+def _invalidate_committed(connection):
+    board_ids = connection.info.pop("changed_board_ids", None)
+    if board_ids:
+        invalidate(board_ids)
+
+
+# A rolled back revision number will be reused by the next write, so entries
+# cached from inside the transaction (an atomic batch) must go too
+@event.listens_for(Engine, "rollback")
+def _discard_rolled_back(connection):
+    board_ids = connection.info.pop("changed_board_ids", None)
+    if board_ids:
+        invalidate(board_ids)
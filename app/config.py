@@ -1,4 +1,33 @@
 import os
+from sqlalchemy.pool import NullPool
+
+
+def env_flag(name, default):
+    return os.environ.get(name, '1' if default else '0').lower() in ('1', 'true')
+
+
+def engine_options(database_uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS from the DB_POOL_* environment variables.
+    With DB_PGBOUNCER on, PgBouncer (transaction pooling) owns the pool and
+    every checkout opens a fresh client connection to it instead.
+    """
+    if env_flag('DB_PGBOUNCER', False):
+        return {'poolclass': NullPool}
+
+    options = {'pool_pre_ping': env_flag('DB_POOL_PRE_PING', True)}
+    if database_uri.startswith('sqlite'):
+        # SQLite files use a NullPool, there is nothing to size
+        return options
+
+    options.update(
+        pool_size=int(os.environ.get('DB_POOL_SIZE', 5)),
+        max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        pool_timeout=int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        # Below Postgres and load balancer idle timeouts
+        pool_recycle=int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    )
+    return options
 
 
 class Config:
@@ -11,4 +40,39 @@ class Config:
     # so the connection uri must be updated here (for production)
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         'DATABASE_URL').replace('postgres://', 'postgresql://')
-    SQLALCHEMY_ECHO = True
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # Comma separated read replicas; GET requests read from one of them
+    SQLALCHEMY_BINDS = {
+        f'replica_{number}': {'url': url, **engine_options(url)}
+        for number, url in enumerate(
+            url.strip().replace('postgres://', 'postgresql://')
+            for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+        )
+    }
+    # After a write, that user's reads stay on the primary this many seconds
+    DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5))
+    # Statement logging is expensive under load; opt in for local debugging
+    SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO', '').lower() in ('1', 'true')
+    # Same statement this many times in one request is reported as a likely N+1
+    SQL_METRICS_REPEAT_THRESHOLD = int(os.environ.get('SQL_METRICS_REPEAT_THRESHOLD', 5))
+    # /api/metrics is disabled unless this is set; scrapers send it as
+    # "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Serialized board payload cache: "memory" (per worker), "sqlite" (shared
+    # by workers on the host through BOARD_CACHE_PATH) or "none"
+    BOARD_CACHE_BACKEND = os.environ.get('BOARD_CACHE_BACKEND', 'memory')
+    BOARD_CACHE_MAX_BYTES = int(os.environ.get('BOARD_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    BOARD_CACHE_PATH = os.environ.get('BOARD_CACHE_PATH')
+    # PBKDF2 runs in a per-worker process pool; 0 workers hashes inline.
+    # Requests beyond PASSWORD_HASH_MAX_PENDING queued hashes get a 503
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 8))
+    # Users loaded for flask-login: "memory" (per worker), "sqlite" (shared by
+    # workers on the host through IDENTITY_CACHE_PATH) or "none"
+    IDENTITY_CACHE_BACKEND = os.environ.get('IDENTITY_CACHE_BACKEND', 'memory')
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 60))
+    IDENTITY_CACHE_PATH = os.environ.get('IDENTITY_CACHE_PATH')
+    # Serve the React build from memory with gzip/brotli variants and long
+    # lived caching. Off by default so `vite build --watch` output is picked up
+    STATIC_ASSET_CACHE = os.environ.get(
+        'STATIC_ASSET_CACHE', '1' if os.environ.get('FLASK_ENV') == 'production' else '0') == '1'
@@ -6,20 +6,16 @@ from app.models import User
 
 def user_exists(form, field):
     # Checking if user exists
-    email = field.data
-    user = User.query.filter(User.email == email).first()
-    if not user:
+    if not form.user:
         raise ValidationError("Email provided not found.")
 
 
 def password_matches(form, field):
     # Checking if password matches
     password = field.data
-    email = form.data["email"]
-    user = User.query.filter(User.email == email).first()
-    if not user:
+    if not form.user:
         return
-    if not user.check_password(password):
+    if not form.user.check_password(password):
         raise ValidationError("Password was incorrect.")
 
 
@@ -36,3 +32,17 @@ class LoginForm(FlaskForm):
         "password",
         validators=[DataRequired(message="Password is required"), password_matches],
     )
+
+    _user = None
+    _user_loaded = False
+
+    @property
+    def user(self):
+        """
+        The user for the submitted email, looked up once and shared by the
+        validators and the login route
+        """
+        if not self._user_loaded:
+            self._user = User.query.filter(User.email == self.data["email"]).first()
+            self._user_loaded = True
+        return self._user
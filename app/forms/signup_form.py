@@ -1,26 +1,11 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField
-from wtforms.validators import DataRequired, Email, ValidationError, Length, EqualTo
-from app.models import User
-
-
-def user_exists(form, field):
-    # Checking if user exists
-    email = field.data
-    user = User.query.filter(User.email == email).first()
-    if user:
-        raise ValidationError("Email address is already in use.")
-
-
-def username_exists(form, field):
-    # Checking if username is already in use
-    username = field.data
-    user = User.query.filter(User.username == username).first()
-    if user:
-        raise ValidationError("Username is already in use.")
+from wtforms.validators import DataRequired, Email, Length, EqualTo
 
 
 class SignUpForm(FlaskForm):
+    # Username and email uniqueness is enforced by the users table constraints,
+    # see sign_up in auth_routes.py
     username = StringField(
         "username",
         validators=[
@@ -28,7 +13,6 @@ class SignUpForm(FlaskForm):
             Length(
                 min=3, max=40, message="Username must be between 3 and 40 characters"
             ),
-            username_exists,
         ],
     )
 
@@ -37,7 +21,6 @@ class SignUpForm(FlaskForm):
         validators=[
             DataRequired(message="Email is required"),
             Email(message="Please provide a valid email address"),
-            user_exists,
         ],
     )
 
@@ -0,0 +1,71 @@
+import json
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import make_transient_to_detached
+from .local_cache import LocalCache
+from .models import db, User
+
+
+# Short-lived copies of the user columns flask-login needs, keyed by user id,
+# so authenticated requests do not query the users table. Entries expire
+# after IDENTITY_CACHE_TTL seconds and are dropped as soon as a write to the
+# user commits. The password hash is never cached. A failing cache falls
+# back to the users table, so it can never fail an authenticated request.
+
+CACHED_COLUMNS = ("id", "username", "email")
+
+
+_cache = LocalCache("IDENTITY_CACHE")
+
+
+def init_app(app):
+    """Configures the identity cache backend from app config"""
+    app.config.setdefault("IDENTITY_CACHE_TTL", 60)
+    _cache.init_app(app, ttl=app.config["IDENTITY_CACHE_TTL"])
+
+
+def _attach(columns):
+    # Rebuild the user as if it had been loaded, then attach it to the session
+    # without a SELECT so relationships still lazy load
+    user = User(**columns)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def load_user(user_id):
+    """The user for a session id, from the cache when possible"""
+    value = _cache.get(str(user_id))
+    if value is not None:
+        return _attach(json.loads(value))
+
+    user = User.query.get(user_id)
+    if user is not None:
+        _cache.set(str(user_id), user_id, json.dumps({column: getattr(user, column) for column in CACHED_COLUMNS}))
+    return user
+
+
+def invalidate(user_ids):
+    _cache.invalidate(user_ids)
+
+
+def snapshot():
+    return _cache.snapshot()
+
+
+# Users written on a connection are invalidated once the transaction commits
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _track_changed_user(mapper, connection, target):
+    connection.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Engine, "commit")
+def _invalidate_committed(connection):
+    user_ids = connection.info.pop("changed_user_ids", None)
+    if user_ids:
+        invalidate(user_ids)
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_rolled_back(connection):
+    connection.info.pop("changed_user_ids", None)
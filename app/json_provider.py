@@ -0,0 +1,71 @@
+from datetime import date, datetime, timezone
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib provider
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack responses are then unavailable
+    msgpack = None
+
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def _iso_default(o):
+    # Naive datetimes from the database are stored in UTC
+    if isinstance(o, datetime):
+        return (o if o.tzinfo else o.replace(tzinfo=timezone.utc)).isoformat()
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, with MessagePack responses for clients
+    that ask for them with `Accept: application/msgpack`.
+    Datetimes are encoded natively as ISO 8601 in UTC.
+    Falls back to the stdlib provider when orjson is not installed.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj):
+        if orjson is None:
+            return super().dumps(obj).encode()
+        return orjson.dumps(
+            obj,
+            default=_iso_default,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS,
+        )
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def negotiate(self):
+        """Mimetype the current request prefers, JSON unless msgpack is asked for"""
+        if msgpack is None:
+            return JSON_MIMETYPE
+        best = request.accept_mimetypes.best_match([JSON_MIMETYPE, MSGPACK_MIMETYPE])
+        return MSGPACK_MIMETYPE if best == MSGPACK_MIMETYPE else JSON_MIMETYPE
+
+    def serialize(self, obj, mimetype):
+        if mimetype == MSGPACK_MIMETYPE:
+            return msgpack.packb(obj, default=_iso_default)
+        return self.dumps_bytes(obj)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        mimetype = self.negotiate()
+        response = self._app.response_class(self.serialize(obj, mimetype), mimetype=mimetype)
+        response.vary.add("Accept")
+        return response
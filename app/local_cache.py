@@ -0,0 +1,271 @@
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+from threading import Lock
+
+
+# Host-local caches shared by board_cache and identity_cache. Every entry has
+# a key, a tag that invalidation works on (a board id, a user id) and a value,
+# and is capped by total value size, by age, or both. A failing backend is
+# logged and treated as a miss, never as a failed request.
+
+logger = logging.getLogger(__name__)
+
+# A hit only rewrites its access time once it is older than this many
+# seconds, so most reads stay read-only and the LRU order is approximate
+ACCESS_RESOLUTION = 60
+# Eviction frees down to this share of the cap, so the full table scan it
+# needs runs once per many writes rather than on every write
+EVICT_TO = 0.75
+# Bumped whenever the table layout changes; older cache files are rebuilt
+SCHEMA_VERSION = 1
+
+
+class MemoryBackend:
+    """Per-process LRU; other workers rely on the revision or the TTL after a write"""
+
+    def __init__(self, max_bytes=None, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        # key -> (tag, value, expires), least recently used first
+        self.entries = OrderedDict()
+        self.tags = {}
+        self.lock = Lock()
+
+    def _remove(self, key):
+        tag, value, _ = self.entries.pop(key)
+        self.size -= len(value)
+        keys = self.tags[tag]
+        keys.discard(key)
+        if not keys:
+            del self.tags[tag]
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] is not None and entry[2] < time.monotonic():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, tag, value):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (tag, value, expires)
+            self.tags.setdefault(tag, set()).add(key)
+            self.size += len(value)
+            while self.max_bytes is not None and self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, tags):
+        with self.lock:
+            for tag in tags:
+                for key in list(self.tags.get(tag, ())):
+                    self._remove(key)
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.size, "max_bytes": self.max_bytes, "ttl": self.ttl}
+
+
+class SQLiteBackend:
+    """LRU in a local SQLite file, shared by every gunicorn worker on the host"""
+
+    def __init__(self, path, max_bytes=None, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                connection.execute("BEGIN IMMEDIATE")
+                # Another worker may have rebuilt the file while this one waited
+                if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    # Only cached copies live here, so an old layout is dropped
+                    tables = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+                    for (table,) in tables:
+                        connection.execute(f'DROP TABLE "{table}"')
+                    self._create_tables(connection)
+                    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                connection.execute("COMMIT")
+
+    @staticmethod
+    def _create_tables(connection):
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, tag INTEGER NOT NULL, value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, accessed REAL NOT NULL, expires REAL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_tag ON entries (tag)")
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed)")
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_expires ON entries (expires)")
+        # Running total of the value sizes, kept by triggers so a write can
+        # tell whether eviction is needed without summing the table
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries_size ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), total INTEGER NOT NULL)"
+        )
+        connection.execute("INSERT OR IGNORE INTO entries_size (id, total) VALUES (1, 0)")
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries "
+            "BEGIN UPDATE entries_size SET total = total + NEW.size; END"
+        )
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_updated AFTER UPDATE OF size ON entries "
+            "BEGIN UPDATE entries_size SET total = total + NEW.size - OLD.size; END"
+        )
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries "
+            "BEGIN UPDATE entries_size SET total = total - OLD.size; END"
+        )
+
+    def connect(self):
+        # Autocommit: every statement is its own short transaction. A cache
+        # that is busy for longer than the timeout is better skipped than waited on
+        return closing(sqlite3.connect(self.path, timeout=0.25, isolation_level=None))
+
+    def get(self, key):
+        now = time.time()
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT value, accessed FROM entries WHERE key = ? AND (expires IS NULL OR expires >= ?)",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now - ACCESS_RESOLUTION:
+                try:
+                    connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                except sqlite3.OperationalError:
+                    # Another worker is writing; the entry just ages a little
+                    pass
+            return row[0]
+
+    def set(self, key, tag, value):
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT INTO entries (key, tag, value, size, accessed, expires) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tag = excluded.tag, value = excluded.value, "
+                "size = excluded.size, accessed = excluded.accessed, expires = excluded.expires",
+                (key, tag, value, len(value), now, now + self.ttl if self.ttl is not None else None),
+            )
+            if self.ttl is not None:
+                connection.execute("DELETE FROM entries WHERE expires < ?", (now,))
+            if self.max_bytes is not None:
+                total = connection.execute("SELECT total FROM entries_size").fetchone()[0]
+                if total > self.max_bytes:
+                    # Evict least recently used entries until well under the cap
+                    connection.execute(
+                        "DELETE FROM entries WHERE key IN ("
+                        " SELECT key FROM ("
+                        "  SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS running FROM entries"
+                        " ) WHERE running > ?)",
+                        (int(self.max_bytes * EVICT_TO),),
+                    )
+
+    def invalidate(self, tags):
+        with self.connect() as connection:
+            connection.executemany("DELETE FROM entries WHERE tag = ?", [(tag,) for tag in tags])
+
+    def stats(self):
+        with self.connect() as connection:
+            entries = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = connection.execute("SELECT total FROM entries_size").fetchone()[0]
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, "ttl": self.ttl}
+
+
+class LocalCache:
+    """
+    A backend chosen by the <PREFIX>_BACKEND setting plus hit/miss counters.
+    Backend errors are logged and counted, and read as a miss.
+    """
+
+    def __init__(self, config_prefix):
+        self.config_prefix = config_prefix
+        self.backend = None
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0, "errors": 0}
+        self.counters_lock = Lock()
+
+    def init_app(self, app, max_bytes=None, ttl=None):
+        """Configures the backend from <PREFIX>_BACKEND and <PREFIX>_PATH"""
+        prefix = self.config_prefix
+        app.config.setdefault(f"{prefix}_BACKEND", "memory")
+        if not app.config.get(f"{prefix}_PATH"):
+            app.config[f"{prefix}_PATH"] = os.path.join(app.instance_path, f"{prefix.lower()}.sqlite3")
+
+        backend = app.config[f"{prefix}_BACKEND"]
+        if backend == "memory":
+            self.backend = MemoryBackend(max_bytes, ttl)
+        elif backend == "sqlite":
+            os.makedirs(os.path.dirname(app.config[f"{prefix}_PATH"]), exist_ok=True)
+            self.backend = SQLiteBackend(app.config[f"{prefix}_PATH"], max_bytes, ttl)
+        elif backend == "none":
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown {prefix}_BACKEND {backend!r}")
+
+    def count(self, counter):
+        with self.counters_lock:
+            self.counters[counter] += 1
+
+    def _failed(self, operation):
+        name = self.config_prefix.replace("_", " ").capitalize()
+        logger.warning("%s %s failed, continuing without it", name, operation, exc_info=True)
+        self.count("errors")
+
+    def get(self, key):
+        """Cached value, or None on a miss or when the cache is off"""
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except sqlite3.Error:
+            self._failed("lookup")
+            value = None
+        self.count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, tag, value):
+        if self.backend is not None:
+            try:
+                self.backend.set(key, tag, value)
+            except sqlite3.Error:
+                self._failed("store")
+
+    def invalidate(self, tags):
+        if self.backend is not None and tags:
+            try:
+                self.backend.invalidate(frozenset(tags))
+            except sqlite3.Error:
+                self._failed("invalidation")
+                return
+            self.count("invalidations")
+
+    def snapshot(self):
+        with self.counters_lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["misses"]
+        try:
+            stats = self.backend.stats() if self.backend is not None else {}
+        except sqlite3.Error:
+            self._failed("stats")
+            stats = {}
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else None,
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            **stats,
+        }
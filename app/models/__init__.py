@@ -4,4 +4,7 @@ from .db import environment, SCHEMA
 from .card import Card
 from .card_section import CardSection
 from .board import Board
-from .favorite import Favorite
\ No newline at end of file
+from .favorite import Favorite
+from .board_change import BoardChange
+from .label import Label, card_labels, sync_card_labels
+from .revision import record_board_changes
@@ -1,30 +1,56 @@
 from .db import db, environment, SCHEMA, add_prefix_for_prod
+from .card_section import CardSection
+from sqlalchemy.orm import selectinload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime, timezone
 
 
 class Board(db.Model):
   __tablename__ = 'boards'
 
+  __table_args__ = (
+      # Serves both the owner lookup and keyset pages ordered by id
+      db.Index('ix_boards_user_id_id', 'user_id', 'id'),
+  )
+
   if environment == "production":
-      __table_args__ = {'schema': SCHEMA}
+      __table_args__ += ({'schema': SCHEMA},)
 
   id = db.Column(db.Integer, primary_key=True)
   name = db.Column(db.String(255), nullable=False)
   user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')), nullable=False)
-  created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-  updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+  # Bumped by every write to the board, its sections or its cards (see revision.py)
+  revision = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+  created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+  updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
   # Relationships
   user = db.relationship('User', back_populates='boards')
   card_sections = db.relationship('CardSection', back_populates='board', cascade='all, delete-orphan')
   favorites = db.relationship('Favorite', back_populates='board', cascade='all, delete-orphan')
-  
+
+  def load_graph(self):
+    """
+    Loads the sections and ordered cards of an already loaded board in two
+    queries (sections, cards) regardless of board size, so a route that
+    fetched the board for its access check never reads the board row twice.
+    Any other relationship access that would emit SQL raises instead of
+    silently lazy loading. tests/test_query_budgets.py checks the totals.
+    """
+    sections = CardSection.query.options(
+      selectinload(CardSection.cards).raiseload('*', sql_only=True),
+      raiseload('*', sql_only=True)
+    ).filter(CardSection.board_id == self.id).order_by(CardSection.id).all()
+    set_committed_value(self, 'card_sections', sections)
+    return self
+
 
   def to_dict_basic(self):
     return {
       "id": self.id,
       "name": self.name,
       "userId": self.user_id,
+      "revision": self.revision,
       "createdAt": self.created_at,
       "updatedAt": self.updated_at
     }
@@ -0,0 +1,31 @@
+from .db import db, environment, SCHEMA, add_prefix_for_prod
+
+
+class BoardChange(db.Model):
+  """
+  Log of writes to a board's contents, one row per entity touched per
+  revision. Backs the delta sync endpoint; only the newest rows of each
+  board are kept (see revision.py).
+  """
+  __tablename__ = 'board_changes'
+
+  __table_args__ = (
+      db.Index('ix_board_changes_board_id_revision', 'board_id', 'revision'),
+  )
+
+  if environment == "production":
+      __table_args__ += ({'schema': SCHEMA},)
+
+  id = db.Column(db.Integer, primary_key=True)
+  board_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('boards.id'), ondelete='CASCADE'), nullable=False)
+  revision = db.Column(db.Integer, nullable=False)
+  entity_type = db.Column(db.String(20), nullable=False)
+  entity_id = db.Column(db.Integer, nullable=False)
+  op = db.Column(db.String(10), nullable=False)
+
+  ENTITY_BOARD = 'board'
+  ENTITY_SECTION = 'section'
+  ENTITY_CARD = 'card'
+
+  OP_UPSERT = 'upsert'
+  OP_DELETE = 'delete'
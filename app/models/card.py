@@ -1,25 +1,42 @@
 from .db import db, environment, SCHEMA, add_prefix_for_prod
+from .card_section import CardSection
+from .rank import rank_for_position
+from sqlalchemy import event, select, inspect
 from datetime import datetime, timezone
 
 class Card(db.Model):
     __tablename__ = 'cards'
 
+    __table_args__ = (
+        # Cards are always read and ranked within a section
+        db.Index('ix_cards_card_section_id_rank', 'card_section_id', 'rank'),
+    )
+
     if environment == "production":
-      __table_args__ = {'schema': SCHEMA}
-  
+      __table_args__ += ({'schema': SCHEMA},)
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     labels = db.Column(db.String(255))
     due_date = db.Column(db.DateTime)
     order = db.Column(db.Integer)
+    # Fractional sort key, see app/models/rank.py
+    rank = db.Column(db.String(64))
     card_section_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('card_sections.id')), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    # Denormalized from card_sections.owner_id so ownership checks skip the section/board walk
+    owner_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     # Relationships
     card_section = db.relationship('CardSection', back_populates='cards')
 
+    @classmethod
+    def get_owned(cls, card_id, user_id):
+        """Single indexed lookup of a card by id and owner"""
+        return cls.query.filter(cls.id == card_id, cls.owner_id == user_id).first()
+
     def to_dict_basic(self):
         return {
         "id": self.id,
@@ -28,8 +45,32 @@ class Card(db.Model):
         "labels": self.labels,
         "dueDate": self.due_date,
         "order": self.order,
+        "rank": self.rank,
         "cardSectionId": self.card_section_id,
         "createdAt": self.created_at,
         "updatedAt": self.updated_at,
-        "userId": self.card_section.to_dict_basic()['userId']
-    }
\ No newline at end of file
+        "userId": self.owner_id
+    }
+
+
+def _section_owner(card_section_id):
+    # Resolved inside the INSERT/UPDATE statement itself, no extra round trip
+    return (
+        select(CardSection.owner_id)
+        .where(CardSection.id == card_section_id)
+        .scalar_subquery()
+    )
+
+
+@event.listens_for(Card, 'before_insert')
+def _set_owner_on_insert(mapper, connection, target):
+    if target.owner_id is None:
+        target.owner_id = _section_owner(target.card_section_id)
+    if target.rank is None:
+        target.rank = rank_for_position(target.order or 0)
+
+
+@event.listens_for(Card, 'before_update')
+def _set_owner_on_move(mapper, connection, target):
+    if inspect(target).attrs.card_section_id.history.has_changes():
+        target.owner_id = _section_owner(target.card_section_id)
@@ -1,4 +1,5 @@
 from .db import db, environment, SCHEMA, add_prefix_for_prod
+from sqlalchemy import event, select
 from datetime import datetime, timezone
 
 class CardSection(db.Model):
@@ -9,13 +10,20 @@ class CardSection(db.Model):
   
   id = db.Column(db.Integer, primary_key=True)
   title = db.Column(db.String(255), nullable=False)
-  board_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('boards.id')), nullable=False)
-  created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-  updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+  board_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('boards.id')), nullable=False, index=True)
+  # Denormalized from boards.user_id so ownership checks skip the board lookup
+  owner_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')), nullable=False, index=True)
+  created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+  updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
   # Relationships
   board = db.relationship('Board', back_populates='card_sections')
-  cards = db.relationship('Card', back_populates='card_section', cascade='all, delete-orphan')
+  cards = db.relationship('Card', back_populates='card_section', cascade='all, delete-orphan', order_by='Card.rank')
+
+  @classmethod
+  def get_owned(cls, section_id, user_id):
+    """Single indexed lookup of a section by id and owner"""
+    return cls.query.filter(cls.id == section_id, cls.owner_id == user_id).first()
 
   def to_dict_basic(self):
     return {
@@ -24,11 +32,23 @@ class CardSection(db.Model):
       "boardId": self.board_id,
       "createdAt": self.created_at,
       "updatedAt": self.updated_at,
-      "userId": self.board.user_id
+      "userId": self.owner_id
     }
   
   def to_dict_card(self):
      return {
         **self.to_dict_basic(),
-        "Cards": [card.to_dict_basic() for card in sorted(self.cards, key=lambda c: c.order)]
-     }
\ No newline at end of file
+        "Cards": [card.to_dict_basic() for card in self.cards]
+     }
+
+
+@event.listens_for(CardSection, 'before_insert')
+def _set_owner_on_insert(mapper, connection, target):
+  if target.owner_id is None:
+    from .board import Board
+    # Resolved inside the INSERT statement itself, no extra round trip
+    target.owner_id = (
+      select(Board.user_id)
+      .where(Board.id == target.board_id)
+      .scalar_subquery()
+    )
@@ -1,11 +1,88 @@
+from contextlib import contextmanager
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
 
 import os
 environment = os.getenv("FLASK_ENV")
 SCHEMA = os.environ.get("SCHEMA")
 
 
-db = SQLAlchemy()
+class RoutingSession(Session):
+    """
+    Sends reads to the replica picked for the current request (g.db_replica,
+    see app/replica_routing.py) and everything else to the primary.
+
+    Inside deferred_commits() a commit() only flushes, so several routes
+    can run as one unit that the caller commits or rolls back at the end
+    (see app/api/batch_routes.py). Work that must wait for the real commit
+    goes through run_after_commit().
+    """
+
+    @property
+    def commits_deferred(self):
+        return self.info.get("defer_commits", False)
+
+    @contextmanager
+    def deferred_commits(self):
+        self.info["defer_commits"] = True
+        try:
+            yield self
+        finally:
+            self.info.pop("defer_commits", None)
+
+    def commit(self):
+        if self.commits_deferred:
+            self.flush()
+            return
+        super().commit()
+
+    def rollback(self):
+        # Callbacks waiting on a deferred commit die with it
+        self.info.pop("after_commit", None)
+        super().rollback()
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get("db_replica")
+            and not getattr(clause, "is_dml", False)
+        ):
+            return self._db.engines[g.db_replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def run_after_commit(callback):
+    """
+    Runs callback now, or once the deferred unit it belongs to commits.
+    Dropped if that unit rolls back.
+    """
+    session = db.session()
+    if session.commits_deferred:
+        session.info.setdefault("after_commit", []).append(callback)
+    else:
+        callback()
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _run_deferred_callbacks(session):
+    for callback in session.info.pop("after_commit", []):
+        callback()
+
+
+def insert_ignoring_duplicates(table, bind=None):
+    """INSERT that skips rows hitting a unique constraint, for the current dialect"""
+    if (bind or db.session.get_bind()).dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
 
 # helper function for adding prefix to foreign key column references in production
 def add_prefix_for_prod(attr):
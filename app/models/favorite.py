@@ -4,14 +4,19 @@ from datetime import datetime, timezone
 class Favorite(db.Model):
   __tablename__ = 'favorites'
 
+  __table_args__ = (
+      # Also serves as the index for listing a user's favorites
+      db.UniqueConstraint('user_id', 'board_id', name='uq_favorites_user_id_board_id'),
+  )
+
   if environment == "production":
-      __table_args__ = {'schema': SCHEMA}
+      __table_args__ += ({'schema': SCHEMA},)
   
   id = db.Column(db.Integer, primary_key=True)
   user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')), nullable=False)
-  board_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('boards.id')), nullable=False)
-  created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-  updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+  board_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('boards.id')), nullable=False, index=True)
+  created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+  updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
   # Relationships
   user = db.relationship('User', back_populates='favorites')
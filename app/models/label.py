@@ -0,0 +1,162 @@
+from .db import db, environment, SCHEMA, add_prefix_for_prod, insert_ignoring_duplicates
+from .card import Card
+from sqlalchemy import delete, event, exists, insert, inspect, select
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+
+# Longest label name, the same limit the card form puts on the labels field
+MAX_LABEL_LENGTH = 50
+
+card_labels = db.Table(
+    'card_labels',
+    db.Column('card_id', db.Integer, db.ForeignKey(add_prefix_for_prod('cards.id'), ondelete='CASCADE'), primary_key=True),
+    db.Column('label_id', db.Integer, db.ForeignKey(add_prefix_for_prod('labels.id'), ondelete='CASCADE'), primary_key=True),
+    # The primary key serves lookups by card, this index filtering cards by label
+    db.Index('ix_card_labels_label_id_card_id', 'label_id', 'card_id'),
+    **({'schema': SCHEMA} if environment == "production" else {}),
+)
+
+
+class Label(db.Model):
+    """
+    A user's label, shared by all of their cards. The card_labels rows are
+    the source of truth for filtering; Card.labels keeps the comma-separated
+    names for display and search and is kept in sync on every card write.
+    A label no card carries any more is deleted in the same flush.
+    """
+    __tablename__ = 'labels'
+
+    __table_args__ = (
+        # Also serves the lookup of a user's labels by name
+        db.UniqueConstraint('owner_id', 'name', name='uq_labels_owner_id_name'),
+    )
+
+    if environment == "production":
+      __table_args__ += ({'schema': SCHEMA},)
+
+    id = db.Column(db.Integer, primary_key=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id'), ondelete='CASCADE'), nullable=False)
+    name = db.Column(db.String(MAX_LABEL_LENGTH), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    def to_dict_basic(self):
+        return {
+        "id": self.id,
+        "name": self.name,
+        "userId": self.owner_id,
+        "createdAt": self.created_at,
+        "updatedAt": self.updated_at
+    }
+
+
+def clean_label_name(name):
+    """Label name with surrounding and repeated whitespace removed"""
+    return " ".join(name.split())[:MAX_LABEL_LENGTH]
+
+
+def parse_labels(text):
+    """Label names in a comma-separated labels string, in order and without duplicates"""
+    names = []
+    for name in (text or "").split(","):
+        name = clean_label_name(name)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def format_labels(names):
+    return ", ".join(names)
+
+
+def sync_card_labels(connection, card_filter):
+    """
+    Rebuilds the card_labels rows of every card matching card_filter (a
+    condition on the cards table) from its labels string, creating the
+    owner's labels that do not exist yet. One statement per step, however
+    many cards match.
+    """
+    cards, labels = Card.__table__, Label.__table__
+    card_names = {
+        row.id: (row.owner_id, parse_labels(row.labels))
+        for row in connection.execute(
+            select(cards.c.id, cards.c.owner_id, cards.c.labels).where(card_filter)
+        )
+    }
+    if not card_names:
+        return
+
+    wanted = {(owner_id, name) for owner_id, names in card_names.values() for name in names}
+    label_ids = {}
+    if wanted:
+        connection.execute(
+            insert_ignoring_duplicates(labels, connection)
+            .on_conflict_do_nothing(index_elements=["owner_id", "name"]),
+            [{"owner_id": owner_id, "name": name} for owner_id, name in wanted],
+        )
+        label_ids = {
+            (row.owner_id, row.name): row.id
+            for row in connection.execute(
+                select(labels.c.id, labels.c.owner_id, labels.c.name).where(
+                    labels.c.owner_id.in_({owner_id for owner_id, _ in wanted}),
+                    labels.c.name.in_({name for _, name in wanted}),
+                )
+            )
+        }
+
+    connection.execute(
+        delete(card_labels).where(card_labels.c.card_id.in_(select(cards.c.id).where(card_filter)))
+    )
+    rows = [
+        {"card_id": card_id, "label_id": label_ids[(owner_id, name)]}
+        for card_id, (owner_id, names) in card_names.items()
+        for name in names
+    ]
+    if rows:
+        connection.execute(insert(card_labels), rows)
+    delete_unused_labels(connection, {owner_id for owner_id, _ in card_names.values()})
+
+
+def delete_unused_labels(connection, owner_ids):
+    """Drops the given users' labels that no card carries any more"""
+    labels = Label.__table__
+    connection.execute(
+        delete(labels).where(
+            labels.c.owner_id.in_(owner_ids),
+            ~exists().where(card_labels.c.label_id == labels.c.id),
+        )
+    )
+
+
+# Card writes are collected per connection by the mapper events and applied
+# once per flush, so a flush touching many cards still costs a few statements
+
+@event.listens_for(Card, 'after_insert')
+def _collect_inserted_card(mapper, connection, target):
+    if target.labels:
+        connection.info.setdefault("label_card_ids", set()).add(target.id)
+
+
+@event.listens_for(Card, 'after_update')
+def _collect_updated_card(mapper, connection, target):
+    if inspect(target).attrs.labels.history.has_changes():
+        connection.info.setdefault("label_card_ids", set()).add(target.id)
+
+
+@event.listens_for(Card, 'after_delete')
+def _collect_deleted_card(mapper, connection, target):
+    # Postgres cascades the delete itself; SQLite does not enforce foreign keys
+    connection.info.setdefault("unlabelled_card_ids", set()).add(target.id)
+    connection.info.setdefault("unlabelled_owner_ids", set()).add(target.owner_id)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_label_writes(session, flush_context):
+    connection = session.connection()
+    deleted = connection.info.pop("unlabelled_card_ids", None)
+    if deleted:
+        connection.execute(delete(card_labels).where(card_labels.c.card_id.in_(deleted)))
+        delete_unused_labels(connection, connection.info.pop("unlabelled_owner_ids"))
+    changed = connection.info.pop("label_card_ids", None)
+    if changed:
+        sync_card_labels(connection, Card.__table__.c.id.in_(changed))
@@ -0,0 +1,88 @@
+# Fractional rank keys for card ordering.
+#
+# Ranks are lowercase base 36 strings compared lexicographically, so a card
+# can always be placed between two neighbours by writing one new key instead
+# of renumbering the whole section. Keys never end in the lowest digit, which
+# guarantees there is always room for another key below any existing one.
+# Lowercase digits/letters only, so ordering is the same under the C collation
+# and the usual locale collations.
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+# Width of the evenly spaced keys produced from integer positions
+SPACED_WIDTH = 6
+
+# Keys longer than this mean a section has been split often enough to rebalance
+REBALANCE_LENGTH = 24
+
+
+def rank_between(before=None, after=None):
+    """
+    Returns a rank strictly between `before` and `after`
+    Either side may be None to mean the start or end of the section
+    """
+    before = before or ''
+    if after is not None and before >= after:
+        raise ValueError(f"Rank {before!r} is not below {after!r}")
+    return _midpoint(before, after)
+
+
+def _midpoint(low, high):
+    # Walk the shared prefix, padding `low` with zeros
+    if high is not None:
+        prefix = 0
+        while prefix < len(high) and (low[prefix] if prefix < len(low) else '0') == high[prefix]:
+            prefix += 1
+        if prefix > 0:
+            return high[:prefix] + _midpoint(low[prefix:], high[prefix:])
+
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else BASE
+
+    # Room for a digit in between
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+
+    # Adjacent digits: reuse the upper digit when it has a tail, else go deeper
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+
+def rank_for_position(position):
+    """Evenly spaced rank for an integer position (used for bulk renumbering)"""
+    position = max(int(position), 0)
+    digits = []
+    for _ in range(SPACED_WIDTH):
+        position, remainder = divmod(position, BASE)
+        digits.append(DIGITS[remainder])
+    # The trailing middle digit leaves room on both sides of every spaced key
+    return ''.join(reversed(digits)) + DIGITS[BASE // 2]
+
+
+def rank_after(rank):
+    """
+    Rank for appending below `rank` (None for an empty section)
+    Steps to the next spaced key so repeated appends don't grow the key
+    """
+    if rank is None:
+        return rank_for_position(0)
+    position = int(rank[:SPACED_WIDTH].ljust(SPACED_WIDTH, '0'), BASE) + 1
+    if position < BASE ** SPACED_WIDTH:
+        return rank_for_position(position)
+    return rank_between(rank, None)
+
+
+def is_valid_rank(rank, max_length=64):
+    """True for a key these functions could have produced (e.g. from an import)"""
+    return (
+        isinstance(rank, str)
+        and 0 < len(rank) <= max_length
+        and all(digit in DIGITS for digit in rank)
+        and not rank.endswith(DIGITS[0])
+    )
+
+
+def needs_rebalance(rank):
+    return rank is not None and len(rank) > REBALANCE_LENGTH
@@ -0,0 +1,159 @@
+from sqlalchemy import delete, event, inspect, insert, select, update
+from sqlalchemy.orm import Session
+from .board import Board
+from .board_change import BoardChange
+from .card_section import CardSection
+from .card import Card
+
+# Change log rows kept per board. The delta sync endpoint tells a client that
+# is further behind than this to reload the board, so older rows are never read
+RETAINED_CHANGES = 5000
+# A board's log is trimmed on every this many revisions rather than on every write
+PRUNE_INTERVAL = 100
+
+
+def record_board_changes(connection, changes):
+    """
+    Bumps the revision of every affected board with one UPDATE and appends
+    the changes to the board change log at the new revision.
+    `changes` is an iterable of (entity_type, entity_id, op, section_id, board_id);
+    board_id may be None for card changes and is then resolved from section_id.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+
+    # Resolve boards for card changes in one lookup
+    section_boards = {
+        section_id: board_id
+        for _, _, _, section_id, board_id in changes
+        if section_id is not None and board_id is not None
+    }
+    unknown_sections = {
+        section_id for _, _, _, section_id, board_id in changes
+        if board_id is None and section_id not in section_boards
+    }
+    if unknown_sections:
+        section_boards.update(connection.execute(
+            select(CardSection.id, CardSection.board_id)
+            .where(CardSection.id.in_(unknown_sections))
+        ).all())
+
+    # Last change per entity and board wins (a move within a board is an upsert)
+    latest = {}
+    for entity_type, entity_id, op, section_id, board_id in changes:
+        board_id = board_id if board_id is not None else section_boards.get(section_id)
+        if board_id is not None:
+            latest[(board_id, entity_type, entity_id)] = op
+    if not latest:
+        return
+
+    board_ids = {board_id for board_id, _, _ in latest}
+    # Picked up by commit listeners (e.g. the board cache) once the write is durable
+    connection.info.setdefault("changed_board_ids", set()).update(board_ids)
+
+    boards = Board.__table__
+    connection.execute(
+        update(boards)
+        .where(boards.c.id.in_(board_ids))
+        .values(revision=boards.c.revision + 1)
+    )
+    revisions = dict(connection.execute(
+        select(boards.c.id, boards.c.revision).where(boards.c.id.in_(board_ids))
+    ).all())
+
+    # Boards deleted in this flush have nothing left to sync
+    rows = [
+        {
+            "board_id": board_id,
+            "revision": revisions[board_id],
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "op": op,
+        }
+        for (board_id, entity_type, entity_id), op in latest.items()
+        if board_id in revisions
+    ]
+    if rows:
+        connection.execute(insert(BoardChange.__table__), rows)
+    prune_board_changes(connection, revisions)
+
+
+def prune_board_changes(connection, revisions):
+    """
+    Trims the change log of every board whose new revision is a multiple of
+    PRUNE_INTERVAL to its newest RETAINED_CHANGES rows. Whole revisions are
+    dropped, so the log a board keeps always runs unbroken up to its current revision.
+    `revisions` maps board ids to their current revision.
+    """
+    changes = BoardChange.__table__
+    for board_id, revision in revisions.items():
+        if revision % PRUNE_INTERVAL:
+            continue
+        # Both statements walk the (board_id, revision) index
+        cutoff = connection.execute(
+            select(changes.c.revision)
+            .where(changes.c.board_id == board_id)
+            .order_by(changes.c.revision.desc())
+            .offset(RETAINED_CHANGES)
+            .limit(1)
+        ).scalar()
+        if cutoff is not None:
+            connection.execute(
+                delete(changes).where(changes.c.board_id == board_id, changes.c.revision <= cutoff)
+            )
+
+
+def _card_changes(card, op):
+    # A move is a delete from the old section and an upsert into the new one
+    history = inspect(card).attrs.card_section_id.history
+    changes = [
+        (BoardChange.ENTITY_CARD, card, BoardChange.OP_DELETE, section_id, None)
+        for section_id in history.deleted if section_id is not None
+    ]
+    changes.append((BoardChange.ENTITY_CARD, card, op, card.card_section_id, None))
+    return changes
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_board_writes(session, flush_context, instances):
+    # Entities are kept as objects since new rows have no id until the flush
+    changes = []
+
+    for obj in session.new:
+        if isinstance(obj, CardSection):
+            changes.append((BoardChange.ENTITY_SECTION, obj, BoardChange.OP_UPSERT, None, obj.board_id))
+        elif isinstance(obj, Card):
+            changes += _card_changes(obj, BoardChange.OP_UPSERT)
+
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, Board):
+            changes.append((BoardChange.ENTITY_BOARD, obj, BoardChange.OP_UPSERT, None, obj.id))
+        elif isinstance(obj, CardSection):
+            changes.append((BoardChange.ENTITY_SECTION, obj, BoardChange.OP_UPSERT, None, obj.board_id))
+        elif isinstance(obj, Card):
+            changes += _card_changes(obj, BoardChange.OP_UPSERT)
+
+    for obj in session.deleted:
+        if isinstance(obj, Board):
+            changes.append((BoardChange.ENTITY_BOARD, obj, BoardChange.OP_DELETE, None, obj.id))
+        elif isinstance(obj, CardSection):
+            changes.append((BoardChange.ENTITY_SECTION, obj, BoardChange.OP_DELETE, None, obj.board_id))
+        elif isinstance(obj, Card):
+            changes.append((BoardChange.ENTITY_CARD, obj, BoardChange.OP_DELETE, obj.card_section_id, None))
+
+    if changes:
+        session.info.setdefault('board_writes', []).extend(changes)
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_board_writes(session, flush_context):
+    changes = session.info.pop('board_writes', [])
+    if changes:
+        record_board_changes(session.connection(), [
+            # Sections map themselves to their board for cards deleted alongside them
+            (entity_type, obj.id, op, obj.id if entity_type == BoardChange.ENTITY_SECTION else section_id, board_id)
+            for entity_type, obj, op, section_id, board_id in changes
+        ])
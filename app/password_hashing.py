@@ -0,0 +1,173 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import BoundedSemaphore, Lock
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+
+# PBKDF2 hashing and verification run in a small process pool so a burst of
+# logins cannot pin every request thread. At most PASSWORD_HASH_MAX_PENDING
+# operations may be queued or running per worker process; past that callers
+# get HashingBusy, which is answered with a fast 503 instead of queueing
+# indefinitely.
+#
+# The pool and the cap are per worker process, and the calling thread or
+# greenlet waits for its result. They only pay off when a worker serves
+# several requests at once (gunicorn's gthread or gevent workers); a sync
+# worker has at most one hash in flight, so gunicorn.conf.py hashes inline
+# there.
+#
+# The pool uses the spawn start method, whose children re-import the main
+# module. Scripts that hash at import time should keep that code under an
+# `if __name__ == "__main__":` guard: without one it runs again in every
+# pool child, where hashing falls back to inline instead of failing with
+# BrokenProcessPool.
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing pool is saturated"""
+
+
+_lock = Lock()
+_settings = {
+    "workers": 2,
+    "max_pending": 8,
+    "method": f"pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}",
+}
+_pool = None
+_pool_pid = None
+_slots = None
+_in_flight = 0
+_stats = {}
+
+
+def init_app(app):
+    """Configures the hashing pool from app config and registers the 503 handler"""
+    global _slots
+    app.config.setdefault("PASSWORD_HASH_WORKERS", 2)
+    app.config.setdefault("PASSWORD_HASH_MAX_PENDING", 8)
+    app.config.setdefault("PASSWORD_HASH_METHOD", _settings["method"])
+
+    _settings["workers"] = app.config["PASSWORD_HASH_WORKERS"]
+    _settings["max_pending"] = app.config["PASSWORD_HASH_MAX_PENDING"]
+    _settings["method"] = app.config["PASSWORD_HASH_METHOD"]
+    _slots = BoundedSemaphore(_settings["max_pending"]) if _settings["workers"] else None
+
+    @app.errorhandler(HashingBusy)
+    def hashing_busy(error):
+        return {"errors": {"message": "Server is busy, please try again"}}, 503, {"Retry-After": "1"}
+
+
+def _executor():
+    # Created lazily and per process, so a pool is never inherited by a
+    # forked gunicorn worker. Spawned children only import werkzeug.
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=_settings["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _reset():
+    global _pool
+    with _lock:
+        _pool = None
+
+
+def _record(operation, elapsed_ms=None):
+    with _lock:
+        stats = _stats.setdefault(operation, {"count": 0, "ms": 0.0, "max_ms": 0.0, "rejected": 0})
+        if elapsed_ms is None:
+            stats["rejected"] += 1
+            return
+        stats["count"] += 1
+        stats["ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+
+def _track(change):
+    global _in_flight
+    with _lock:
+        _in_flight += change
+
+
+def _run(operation, fn, *args):
+    started = time.perf_counter()
+    if _slots is None:
+        # No pool configured (or the app was never initialised): hash inline
+        result = fn(*args)
+    else:
+        if not _slots.acquire(blocking=False):
+            _record(operation)
+            raise HashingBusy()
+        _track(1)
+        try:
+            try:
+                future = _executor().submit(fn, *args)
+            except RuntimeError:
+                # Spawn refuses to start processes from a pool child that is
+                # still importing the main module; hash there inline
+                _reset()
+                result = fn(*args)
+            else:
+                result = future.result()
+        except BrokenProcessPool:
+            # A crashed child poisons the executor; start a fresh one next time
+            _reset()
+            raise
+        finally:
+            _track(-1)
+            _slots.release()
+    _record(operation, (time.perf_counter() - started) * 1000)
+    return result
+
+
+def warm_up():
+    """Starts the pool's processes ahead of the first login"""
+    if _slots is None:
+        return
+    executor = _executor()
+    for future in [executor.submit(int) for _ in range(_settings["workers"])]:
+        future.result()
+
+
+def hash_password(password):
+    return _run("hash", generate_password_hash, password, _settings["method"])
+
+
+def verify_password(pwhash, password):
+    return _run("verify", check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash):
+    """True when a stored hash was made with other than the current parameters"""
+    return pwhash.split("$", 1)[0] != _settings["method"]
+
+
+def snapshot():
+    """Per-operation hashing timings since the worker started"""
+    with _lock:
+        return {
+            "workers": _settings["workers"],
+            "max_pending": _settings["max_pending"],
+            "in_flight": _in_flight,
+            "operations": {
+                operation: {
+                    **stats,
+                    "ms": round(stats["ms"], 3),
+                    "avg_ms": round(stats["ms"] / stats["count"], 3) if stats["count"] else 0.0,
+                    "max_ms": round(stats["max_ms"], 3),
+                }
+                for operation, stats in _stats.items()
+            },
+        }
@@ -0,0 +1,118 @@
+import time
+from threading import Lock
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+
+# Connection pool gauges and checkout wait times for the metrics endpoint.
+# Waits are only measured for QueuePool, which is where they can happen,
+# on the primary and the replicas alike.
+
+_lock = Lock()
+_counters = {
+    "checkouts": 0,
+    "wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+    "timeouts": 0,
+    "connects": 0,
+    "invalidated": 0,
+}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def __init__(self, creator, *args, max_overflow=10, **kwargs):
+        super().__init__(creator, *args, max_overflow=max_overflow, **kwargs)
+        # QueuePool keeps the limit private; recreate() passes it back in
+        self.max_overflow = max_overflow
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with _lock:
+                _counters["timeouts"] += 1
+            raise
+        waited_ms = (time.perf_counter() - started) * 1000
+        with _lock:
+            _counters["wait_ms"] += waited_ms
+            _counters["max_wait_ms"] = max(_counters["max_wait_ms"], waited_ms)
+        return connection
+
+
+def timed_options(uri, options):
+    """A copy of an engine's options with the timed pool where QueuePool would be used"""
+    options = dict(options)
+    if not (uri or "").startswith("sqlite") and options.get("poolclass", QueuePool) is QueuePool:
+        options["poolclass"] = TimedQueuePool
+    return options
+
+
+def init_app(app):
+    """
+    Swaps in the timed pool for the primary and every bind; must run before
+    db.init_app creates the engines. The config dicts are replaced, not
+    changed in place, so the Config class they came from stays untouched.
+    """
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = timed_options(
+        app.config.get("SQLALCHEMY_DATABASE_URI"), app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    )
+    binds = {}
+    for key, bind in (app.config.get("SQLALCHEMY_BINDS") or {}).items():
+        bind = {"url": bind} if isinstance(bind, str) else bind
+        binds[key] = timed_options(str(bind.get("url")), bind)
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def _count(counter):
+    with _lock:
+        _counters[counter] += 1
+
+
+@event.listens_for(Pool, "checkout")
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    _count("checkouts")
+
+
+@event.listens_for(Pool, "connect")
+def _connect(dbapi_connection, connection_record):
+    _count("connects")
+
+
+# Fires for connections found dead by pre-ping or dropped after an error
+@event.listens_for(Pool, "invalidate")
+def _invalidate(dbapi_connection, connection_record, exception):
+    _count("invalidated")
+
+
+def gauges(pool):
+    """Current state of one pool"""
+    state = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        state.update(
+            size=pool.size(),
+            in_use=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=getattr(pool, "max_overflow", None),
+        )
+    return state
+
+
+def snapshot(engines):
+    """
+    Gauges for every engine (by bind key, the primary as "primary") plus
+    counters since the worker started, summed over all of their pools
+    """
+    with _lock:
+        counters = dict(_counters)
+    checkouts = counters["checkouts"] or 1
+    return {
+        "pools": {key or "primary": gauges(engine.pool) for key, engine in engines.items()},
+        **counters,
+        "wait_ms": round(counters["wait_ms"], 3),
+        "max_wait_ms": round(counters["max_wait_ms"], 3),
+        "avg_wait_ms": round(counters["wait_ms"] / checkouts, 3),
+    }
@@ -0,0 +1,60 @@
+import random
+import time
+from threading import Lock
+from flask import g, has_request_context, request, session
+from sqlalchemy import event
+from .models.db import RoutingSession
+
+
+# Safe requests read from a replica bind (replica_0, replica_1, ... in
+# SQLALCHEMY_BINDS) unless the user wrote something within the last
+# DB_REPLICA_STICKY_SECONDS; that deadline lives in the signed session cookie
+# so it holds across gunicorn workers. Writes always go to the primary.
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_lock = Lock()
+_counters = {"replica_requests": 0, "primary_requests": 0, "sticky_requests": 0}
+
+
+def _count(counter):
+    with _lock:
+        _counters[counter] += 1
+
+
+def _pick_replica(app, replicas):
+    if request.method not in READ_METHODS:
+        _count("primary_requests")
+        return
+    if session.get("db_primary_until", 0) > time.time():
+        _count("sticky_requests")
+        return
+    _count("replica_requests")
+    g.db_replica = random.choice(replicas)
+
+
+def _mark_writer(app, response):
+    if g.pop("db_wrote", False):
+        session["db_primary_until"] = time.time() + app.config["DB_REPLICA_STICKY_SECONDS"]
+    return response
+
+
+def init_app(app):
+    """Routes reads to the configured replicas, if there are any"""
+    app.config.setdefault("DB_REPLICA_STICKY_SECONDS", 5)
+    replicas = sorted(key for key in app.config.get("SQLALCHEMY_BINDS", {}) if key.startswith("replica_"))
+    if not replicas:
+        return
+    app.before_request(lambda: _pick_replica(app, replicas))
+    app.after_request(lambda response: _mark_writer(app, response))
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flushed(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+def snapshot():
+    with _lock:
+        return dict(_counters)
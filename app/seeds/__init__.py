@@ -3,6 +3,7 @@ from .users import seed_users, undo_users
 from .boards import seed_boards, undo_boards
 from .card_sections import seed_card_sections, undo_card_sections
 from .cards import seed_cards, undo_cards
+from .labels import undo_labels
 from .favorites import seed_favorites, undo_favorites
 
 from app.models.db import db, environment, SCHEMA
@@ -20,6 +21,7 @@ def seed():
         # command, which will truncate all tables prefixed with 
         # the schema name (see comment in users.py undo_users function).
         undo_favorites()
+        undo_labels()
         undo_cards()
         undo_card_sections()
         undo_boards()
@@ -39,6 +41,7 @@ def seed():
 def undo():
     # Add undo functions here
     undo_favorites()
+    undo_labels()
     undo_cards()
     undo_card_sections()
     undo_boards()
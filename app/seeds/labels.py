@@ -0,0 +1,14 @@
+from app.models import db, environment, SCHEMA
+from sqlalchemy.sql import text
+
+# Labels are created from the seeded cards' labels strings, see app/models/label.py
+
+def undo_labels():
+
+    if environment == "production":
+        db.session.execute(f"TRUNCATE table {SCHEMA}.card_labels, {SCHEMA}.labels RESTART IDENTITY CASCADE;")
+    else:
+        db.session.execute(text("DELETE FROM card_labels"))
+        db.session.execute(text("DELETE FROM labels"))
+        
+    db.session.commit()
@@ -0,0 +1,147 @@
+import re
+import time
+from collections import Counter
+from threading import Lock
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Process-wide totals, aggregated from every finished request
+_lock = Lock()
+_totals = {"requests": 0, "queries": 0, "failed_queries": 0, "db_ms": 0.0, "n_plus_one_requests": 0}
+_endpoints = {}
+_slowest = []
+
+# How many slow statements to keep for the metrics endpoint
+SLOWEST_KEPT = 10
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_stats" in g:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_stats" in g:
+        _record(statement, (time.perf_counter() - conn.info["query_start"].pop()) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _failed_cursor_execute(exception_context):
+    # A failed statement still ran, and its start time must not stay behind
+    # on a pooled connection for the next request to pop
+    conn = exception_context.connection
+    if conn is None or not conn.info.get("query_start"):
+        return
+    started = conn.info["query_start"].pop()
+    if has_request_context() and "sql_stats" in g:
+        g.sql_stats["failed"] += 1
+        _record(exception_context.statement or "", (time.perf_counter() - started) * 1000)
+
+
+def _record(statement, elapsed_ms):
+    stats = g.sql_stats
+    stats["queries"] += 1
+    stats["db_ms"] += elapsed_ms
+    stats["statements"][statement] += 1
+    if elapsed_ms > stats["slowest_ms"]:
+        stats["slowest_ms"] = elapsed_ms
+        stats["slowest"] = statement
+
+
+def _start_request():
+    g.sql_stats = {
+        "queries": 0,
+        "failed": 0,
+        "db_ms": 0.0,
+        "slowest_ms": 0.0,
+        "slowest": None,
+        "statements": Counter(),
+        "started": time.perf_counter(),
+    }
+
+
+def _finish_request(app, response):
+    stats = g.pop("sql_stats", None)
+    if stats is None:
+        return response
+
+    total_ms = (time.perf_counter() - stats["started"]) * 1000
+    threshold = app.config["SQL_METRICS_REPEAT_THRESHOLD"]
+    repeated = {
+        statement: count
+        for statement, count in stats["statements"].items()
+        if count >= threshold
+    }
+    if repeated:
+        app.logger.warning(
+            "Possible N+1 on %s %s: %s",
+            request.method,
+            request.path,
+            "; ".join(f"{count}x {' '.join(statement.split())[:120]}" for statement, count in repeated.items()),
+        )
+
+    endpoint = request.endpoint or "unmatched"
+    with _lock:
+        _totals["requests"] += 1
+        _totals["queries"] += stats["queries"]
+        _totals["failed_queries"] += stats["failed"]
+        _totals["db_ms"] += stats["db_ms"]
+        _totals["n_plus_one_requests"] += bool(repeated)
+
+        summary = _endpoints.setdefault(
+            endpoint,
+            {"requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0, "n_plus_one_requests": 0},
+        )
+        summary["requests"] += 1
+        summary["queries"] += stats["queries"]
+        summary["db_ms"] += stats["db_ms"]
+        summary["max_queries"] = max(summary["max_queries"], stats["queries"])
+        summary["n_plus_one_requests"] += bool(repeated)
+
+        if stats["slowest"] is not None:
+            _slowest.append({
+                "endpoint": endpoint,
+                "ms": round(stats["slowest_ms"], 3),
+                "statement": " ".join(stats["slowest"].split()),
+            })
+            _slowest.sort(key=lambda entry: entry["ms"], reverse=True)
+            del _slowest[SLOWEST_KEPT:]
+
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={stats["db_ms"]:.2f};desc="{stats["queries"]} queries", app;dur={total_ms:.2f}',
+    )
+    return response
+
+
+def statement_count(response):
+    """Statement count from the Server-Timing header set by _finish_request"""
+    match = re.search(r'desc="(\d+) queries"', response.headers.get("Server-Timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+def init_app(app):
+    """Hooks per-request SQL instrumentation into a Flask app"""
+    app.config.setdefault("SQL_METRICS_REPEAT_THRESHOLD", 5)
+    app.before_request(_start_request)
+    app.after_request(lambda response: _finish_request(app, response))
+
+
+def snapshot():
+    """Aggregated SQL metrics since the worker started"""
+    with _lock:
+        requests = _totals["requests"] or 1
+        return {
+            **_totals,
+            "db_ms": round(_totals["db_ms"], 3),
+            "avg_queries_per_request": round(_totals["queries"] / requests, 2),
+            "endpoints": {
+                endpoint: {**summary, "db_ms": round(summary["db_ms"], 3)}
+                for endpoint, summary in _endpoints.items()
+            },
+            "slowest": list(_slowest),
+        }
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - assets are then served gzip or identity only
+    brotli = None
+
+
+# The React build in memory, with gzip and brotli variants negotiated through
+# Accept-Encoding. Variants found next to a file at build time (app.js.gz,
+# app.js.br) are used as is, the rest are compressed once at startup.
+# Vite puts a content hash in asset filenames, so those are cached forever;
+# index.html is revalidated with its ETag on every load.
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+    "image/x-icon",
+    "image/vnd.microsoft.icon",
+)
+# Smaller files are not worth a Content-Encoding round trip
+MIN_COMPRESS_BYTES = 1024
+HASHED_NAME = re.compile(r"-[0-9a-fA-F]{8,}\.\w+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SHORT_LIVED = "public, max-age=3600"
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+
+class StaticAsset:
+    """A built file with its encoded variants"""
+
+    def __init__(self, path, body, mimetype, cache_control):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        self.variants = {"identity": body}
+        if not mimetype.startswith(COMPRESSIBLE_TYPES) or len(body) < MIN_COMPRESS_BYTES:
+            return
+
+        for encoding, suffix, compress in (
+            ("gzip", ".gz", lambda data: gzip.compress(data, 9, mtime=0)),
+            ("br", ".br", brotli.compress if brotli is not None else None),
+        ):
+            if os.path.isfile(path + suffix):
+                with open(path + suffix, "rb") as f:
+                    self.variants[encoding] = f.read()
+            elif compress is not None:
+                encoded = compress(body)
+                if len(encoded) < len(body):
+                    self.variants[encoding] = encoded
+
+    def response(self, app):
+        """The best variant for the request, or a 304 when the client has it"""
+        encoding = next(
+            (encoding for encoding in ENCODINGS if encoding in self.variants and request.accept_encodings[encoding]),
+            "identity",
+        )
+        etag = self.etag if encoding == "identity" else f"{self.etag}-{encoding}"
+
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(self.variants[encoding], mimetype=self.mimetype)
+            if encoding != "identity":
+                response.content_encoding = encoding
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = self.cache_control
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+_assets = {}
+
+
+def _cache_control(name):
+    if name == "index.html":
+        return REVALIDATE
+    if HASHED_NAME.search(name):
+        return IMMUTABLE
+    return SHORT_LIVED
+
+
+def init_app(app):
+    """Loads and precompresses the React build when STATIC_ASSET_CACHE is on"""
+    app.config.setdefault("STATIC_ASSET_CACHE", False)
+    _assets.clear()
+    if not app.config["STATIC_ASSET_CACHE"] or not app.static_folder or not os.path.isdir(app.static_folder):
+        return
+
+    for root, _, files in os.walk(app.static_folder):
+        for filename in files:
+            if filename.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, app.static_folder).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                body = f.read()
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            _assets[name] = StaticAsset(path, body, mimetype, _cache_control(name))
+
+
+def enabled():
+    return bool(_assets)
+
+
+def send_asset(app, name):
+    """Response for a built file, or None when there is no such file"""
+    asset = _assets.get(name)
+    return asset.response(app) if asset is not None else None
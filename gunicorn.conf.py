@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+
+# Gunicorn settings for production, picked up from the working directory
+# (see the Dockerfile). Every setting can be overridden through the
+# environment, e.g. GUNICORN_WORKER_CLASS=sync for the old behaviour.
+#
+#   sync     one request at a time per worker process
+#   gthread  a thread pool per worker, the default
+#   gevent   greenlets per worker, for many slow or idle connections
+
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class in ('gevent', 'gunicorn.workers.ggevent.GeventWorker'):
+    # The app is imported in the master (preload_app), so sockets, threads
+    # and locks must be patched before that import, not in the worker. Only
+    # ever for gevent: patched threads would break the gthread pool.
+    # The password hashing pool works patched (its waits yield to the hub).
+    from gevent import monkey
+    monkey.patch_all()
+
+# A sync worker serves one request at a time, so offloading its password
+# hashes to a process pool only adds overhead (see app/password_hashing.py)
+if worker_class == 'sync':
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+cpus = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+# Threads and greenlets carry the concurrency, so fewer processes are needed
+workers = int(os.environ.get('WEB_CONCURRENCY', cpus * 2 + 1 if worker_class == 'sync' else cpus + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 200))
+
+# Import the app once in the master; workers share its memory copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Recycle workers now and then, at staggered times so they never restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# An empty GUNICORN_ACCESS_LOG turns access logging off
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Connections opened by the master while preloading must not be shared
+    # with the forked workers. close=False drops them from this worker's pool
+    # without closing sockets the master still owns.
+    from app import app
+    from app.models import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Warm up before taking traffic: open a database connection and start
+    # the password hashing processes, so the first requests do not pay for it
+    from sqlalchemy import text
+    from app import app, password_hashing
+    from app.models import db
+
+    with app.app_context():
+        db.session.execute(text('SELECT 1'))
+        db.session.remove()
+    password_hashing.warm_up()
+    worker.log.info("Worker %s warmed up", worker.pid)
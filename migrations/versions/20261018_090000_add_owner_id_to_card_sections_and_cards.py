@@ -0,0 +1,53 @@
+"""Add denormalized owner_id to card_sections and cards
+
+Revision ID: 3c1f7a9d2b64
+Revises: e9fed6d49ab0
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f7a9d2b64'
+down_revision = 'e9fed6d49ab0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('card_sections', sa.Column('owner_id', sa.Integer(), nullable=True))
+    op.add_column('cards', sa.Column('owner_id', sa.Integer(), nullable=True))
+
+    # Backfill existing rows from the board owner
+    op.execute(
+        "UPDATE card_sections SET owner_id = "
+        "(SELECT boards.user_id FROM boards WHERE boards.id = card_sections.board_id)"
+    )
+    op.execute(
+        "UPDATE cards SET owner_id = "
+        "(SELECT card_sections.owner_id FROM card_sections WHERE card_sections.id = cards.card_section_id)"
+    )
+
+    with op.batch_alter_table('card_sections') as batch_op:
+        batch_op.alter_column('owner_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_card_sections_owner_id_users', 'users', ['owner_id'], ['id'])
+        batch_op.create_index('ix_card_sections_owner_id', ['owner_id'], unique=False)
+
+    with op.batch_alter_table('cards') as batch_op:
+        batch_op.alter_column('owner_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_cards_owner_id_users', 'users', ['owner_id'], ['id'])
+        batch_op.create_index('ix_cards_owner_id', ['owner_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('cards') as batch_op:
+        batch_op.drop_index('ix_cards_owner_id')
+        batch_op.drop_constraint('fk_cards_owner_id_users', type_='foreignkey')
+        batch_op.drop_column('owner_id')
+
+    with op.batch_alter_table('card_sections') as batch_op:
+        batch_op.drop_index('ix_card_sections_owner_id')
+        batch_op.drop_constraint('fk_card_sections_owner_id_users', type_='foreignkey')
+        batch_op.drop_column('owner_id')
@@ -0,0 +1,55 @@
+"""Add fractional rank to cards
+
+Revision ID: 8e4b2d6f1a37
+Revises: 3c1f7a9d2b64
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b2d6f1a37'
+down_revision = '3c1f7a9d2b64'
+branch_labels = None
+depends_on = None
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+# Frozen copy of app.models.rank.rank_for_position
+def rank_for_position(position):
+    digits = []
+    for _ in range(6):
+        position, remainder = divmod(position, len(DIGITS))
+        digits.append(DIGITS[remainder])
+    return ''.join(reversed(digits)) + DIGITS[len(DIGITS) // 2]
+
+
+def upgrade():
+    op.add_column('cards', sa.Column('rank', sa.String(length=64), nullable=True))
+
+    # Backfill evenly spaced ranks following the existing order within each section
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        'SELECT id, card_section_id FROM cards ORDER BY card_section_id, "order", id'
+    )).fetchall()
+
+    updates, position, current_section = [], 0, None
+    for card_id, card_section_id in rows:
+        if card_section_id != current_section:
+            position, current_section = 0, card_section_id
+        updates.append({"card_id": card_id, "rank": rank_for_position(position)})
+        position += 1
+
+    if updates:
+        connection.execute(sa.text('UPDATE cards SET rank = :rank WHERE id = :card_id'), updates)
+
+    op.create_index('ix_cards_card_section_id_rank', 'cards', ['card_section_id', 'rank'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_cards_card_section_id_rank', table_name='cards')
+    with op.batch_alter_table('cards') as batch_op:
+        batch_op.drop_column('rank')
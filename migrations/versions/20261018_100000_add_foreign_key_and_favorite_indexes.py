@@ -0,0 +1,39 @@
+"""Add foreign key indexes and unique favorites per user and board
+
+Revision ID: 5a9d0c3e7f12
+Revises: 8e4b2d6f1a37
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9d0c3e7f12'
+down_revision = '8e4b2d6f1a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # cards.card_section_id is already covered by ix_cards_card_section_id_rank
+    op.create_index('ix_boards_user_id', 'boards', ['user_id'], unique=False)
+    op.create_index('ix_card_sections_board_id', 'card_sections', ['board_id'], unique=False)
+    op.create_index('ix_favorites_board_id', 'favorites', ['board_id'], unique=False)
+
+    # Drop duplicate favorites (keeping the oldest) before enforcing uniqueness
+    op.execute(
+        "DELETE FROM favorites WHERE id NOT IN "
+        "(SELECT MIN(id) FROM favorites GROUP BY user_id, board_id)"
+    )
+    with op.batch_alter_table('favorites') as batch_op:
+        batch_op.create_unique_constraint('uq_favorites_user_id_board_id', ['user_id', 'board_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('favorites') as batch_op:
+        batch_op.drop_constraint('uq_favorites_user_id_board_id', type_='unique')
+
+    op.drop_index('ix_favorites_board_id', table_name='favorites')
+    op.drop_index('ix_card_sections_board_id', table_name='card_sections')
+    op.drop_index('ix_boards_user_id', table_name='boards')
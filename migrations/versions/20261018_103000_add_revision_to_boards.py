@@ -0,0 +1,25 @@
+"""Add revision counter to boards
+
+Revision ID: b72e5f0c94d8
+Revises: 5a9d0c3e7f12
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b72e5f0c94d8'
+down_revision = '5a9d0c3e7f12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('boards', sa.Column('revision', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('boards') as batch_op:
+        batch_op.drop_column('revision')
@@ -0,0 +1,35 @@
+"""Create board change log for delta sync
+
+Revision ID: d41a6c8e2f95
+Revises: b72e5f0c94d8
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41a6c8e2f95'
+down_revision = 'b72e5f0c94d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('board_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('board_id', sa.Integer(), nullable=False),
+    sa.Column('revision', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.ForeignKeyConstraint(['board_id'], ['boards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_board_changes_board_id_revision', 'board_changes', ['board_id', 'revision'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_board_changes_board_id_revision', table_name='board_changes')
+    op.drop_table('board_changes')
@@ -0,0 +1,27 @@
+"""Replace boards user_id index with a (user_id, id) keyset index
+
+Revision ID: 6f2c9b1d4e83
+Revises: d41a6c8e2f95
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '6f2c9b1d4e83'
+down_revision = 'd41a6c8e2f95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Favorites page along uq_favorites_user_id_board_id, cards along
+    # ix_cards_card_section_id_rank and users along the primary key
+    op.create_index('ix_boards_user_id_id', 'boards', ['user_id', 'id'], unique=False)
+    op.drop_index('ix_boards_user_id', table_name='boards')
+
+
+def downgrade():
+    op.create_index('ix_boards_user_id', 'boards', ['user_id'], unique=False)
+    op.drop_index('ix_boards_user_id_id', table_name='boards')
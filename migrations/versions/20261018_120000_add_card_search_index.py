@@ -0,0 +1,69 @@
+"""Add full-text search index over card name, labels and description
+
+Revision ID: 9c3e7a5b1f20
+Revises: 6f2c9b1d4e83
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3e7a5b1f20'
+down_revision = '6f2c9b1d4e83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Generated column: Postgres keeps it current on every insert and update
+        op.execute(
+            "ALTER TABLE cards ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            " setweight(to_tsvector('english', coalesce(name, '')), 'A')"
+            " || setweight(to_tsvector('english', coalesce(labels, '')), 'B')"
+            " || setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX ix_cards_search_vector ON cards USING GIN (search_vector)")
+        return
+
+    # SQLite: external content FTS5 table over cards, kept in sync by triggers.
+    # Reorders and moves do not touch the indexed columns and skip the index.
+    op.execute(
+        "CREATE VIRTUAL TABLE cards_fts USING fts5("
+        "name, labels, description, content='cards', content_rowid='id', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER cards_fts_insert AFTER INSERT ON cards BEGIN"
+        " INSERT INTO cards_fts (rowid, name, labels, description)"
+        " VALUES (new.id, new.name, new.labels, new.description);"
+        " END"
+    )
+    op.execute(
+        "CREATE TRIGGER cards_fts_delete AFTER DELETE ON cards BEGIN"
+        " INSERT INTO cards_fts (cards_fts, rowid, name, labels, description)"
+        " VALUES ('delete', old.id, old.name, old.labels, old.description);"
+        " END"
+    )
+    op.execute(
+        "CREATE TRIGGER cards_fts_update AFTER UPDATE OF name, labels, description ON cards BEGIN"
+        " INSERT INTO cards_fts (cards_fts, rowid, name, labels, description)"
+        " VALUES ('delete', old.id, old.name, old.labels, old.description);"
+        " INSERT INTO cards_fts (rowid, name, labels, description)"
+        " VALUES (new.id, new.name, new.labels, new.description);"
+        " END"
+    )
+    op.execute("INSERT INTO cards_fts (cards_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX ix_cards_search_vector")
+        op.drop_column('cards', 'search_vector')
+        return
+
+    op.execute("DROP TRIGGER cards_fts_update")
+    op.execute("DROP TRIGGER cards_fts_delete")
+    op.execute("DROP TRIGGER cards_fts_insert")
+    op.execute("DROP TABLE cards_fts")
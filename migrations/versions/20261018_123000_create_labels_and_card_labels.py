@@ -0,0 +1,90 @@
+"""Create labels and card_labels, filled from the card labels strings
+
+Revision ID: e5b8d2a4c7f1
+Revises: 9c3e7a5b1f20
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8d2a4c7f1'
+down_revision = '9c3e7a5b1f20'
+branch_labels = None
+depends_on = None
+
+# Same limit and parsing as app/models/label.py, frozen here so later
+# changes to the app do not change what this migration does
+MAX_LABEL_LENGTH = 50
+BATCH_SIZE = 1000
+
+
+def parse_labels(text):
+    names = []
+    for name in (text or "").split(","):
+        name = " ".join(name.split())[:MAX_LABEL_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade():
+    labels = op.create_table('labels',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=MAX_LABEL_LENGTH), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('owner_id', 'name', name='uq_labels_owner_id_name')
+    )
+    card_labels = op.create_table('card_labels',
+    sa.Column('card_id', sa.Integer(), nullable=False),
+    sa.Column('label_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['card_id'], ['cards.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['label_id'], ['labels.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('card_id', 'label_id')
+    )
+    op.create_index('ix_card_labels_label_id_card_id', 'card_labels', ['label_id', 'card_id'], unique=False)
+
+    # Split the existing strings. cards is only read, so the search triggers
+    # on it are left alone.
+    connection = op.get_bind()
+    cards = sa.table('cards', sa.column('id'), sa.column('owner_id'), sa.column('labels'))
+    card_names = {
+        row.id: (row.owner_id, parse_labels(row.labels))
+        for row in connection.execute(
+            sa.select(cards.c.id, cards.c.owner_id, cards.c.labels)
+            .where(cards.c.labels.isnot(None), cards.c.labels != '')
+        )
+    }
+
+    now = sa.func.now()
+    wanted = sorted({(owner_id, name) for owner_id, names in card_names.values() for name in names})
+    for start in range(0, len(wanted), BATCH_SIZE):
+        connection.execute(
+            labels.insert().values(created_at=now, updated_at=now),
+            [{'owner_id': owner_id, 'name': name} for owner_id, name in wanted[start:start + BATCH_SIZE]],
+        )
+
+    label_ids = {
+        (row.owner_id, row.name): row.id
+        for row in connection.execute(sa.select(labels.c.id, labels.c.owner_id, labels.c.name))
+    }
+    links = [
+        {'card_id': card_id, 'label_id': label_ids[(owner_id, name)]}
+        for card_id, (owner_id, names) in card_names.items()
+        for name in names
+    ]
+    for start in range(0, len(links), BATCH_SIZE):
+        connection.execute(card_labels.insert(), links[start:start + BATCH_SIZE])
+
+
+def downgrade():
+    # cards.labels was never dropped, so nothing needs to be written back
+    op.drop_index('ix_card_labels_label_id_card_id', table_name='card_labels')
+    op.drop_table('card_labels')
+    op.drop_table('labels')
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# The app reads its configuration when it is imported, so the throwaway
+# database and the test settings must be in place first
+_workdir = tempfile.mkdtemp(prefix="app-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["FLASK_ENV"] = "development"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# Hash inline, and let every board request miss the cache so statement
+# counts are those of the route itself
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["BOARD_CACHE_BACKEND"] = "none"
+os.environ["IDENTITY_CACHE_BACKEND"] = "memory"
+
+from flask_migrate import upgrade  # noqa: E402
+from app import app as flask_app  # noqa: E402
+from app.models import Board, Card, CardSection, db  # noqa: E402
+from app.seeds import (  # noqa: E402
+    seed_boards, seed_card_sections, seed_cards, seed_favorites, seed_users,
+)
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+DEMO_USER = {"email": "demo@aa.io", "password": "password"}
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The app on a migrated and seeded SQLite database in a temp directory"""
+    with flask_app.app_context():
+        # Migrations rather than create_all, so indexes and the search
+        # triggers match production
+        upgrade(directory=MIGRATIONS)
+        seed_users()
+        seed_boards()
+        seed_card_sections()
+        seed_cards()
+        seed_favorites()
+    yield flask_app
+    with flask_app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+@pytest.fixture
+def client(app):
+    """A test client logged in as the demo user"""
+    client = app.test_client()
+    client.get("/api/auth/")
+    response = client.post("/api/auth/login", data=DEMO_USER)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    # Warm the identity cache so later requests only run the route's statements
+    client.get("/api/auth/")
+    return client
+
+
+@pytest.fixture
+def make_board(app):
+    """Factory for boards of a given size owned by the demo user, returns the board id"""
+    def make(sections, cards_per_section):
+        return _make_board(app, sections, cards_per_section, user_id=1)
+    return make
+
+
+def _make_board(app, sections, cards_per_section, user_id):
+    with app.app_context():
+        board = Board(name=f"{sections}x{cards_per_section}", user_id=user_id)
+        db.session.add(board)
+        db.session.flush()
+        card_sections = [
+            CardSection(title=f"Section {number}", board_id=board.id, owner_id=user_id)
+            for number in range(sections)
+        ]
+        db.session.add_all(card_sections)
+        db.session.flush()
+        db.session.add_all([
+            Card(name=f"Card {position}", order=position, card_section_id=section.id, owner_id=user_id)
+            for section in card_sections
+            for position in range(cards_per_section)
+        ])
+        db.session.commit()
+        return board.id
@@ -0,0 +1,26 @@
+from app.api import card_section_routes
+from app.models import Card, db
+
+
+def test_unsupported_method_gets_a_json_error(client):
+    response = client.post("/api/batch", json={"requests": [{"method": "DELETE", "path": "/api/bootstrap"}]})
+
+    result = response.get_json()["responses"][0]
+    assert result["status"] == 405
+    assert result["body"]["error"] == "Method Not Allowed"
+
+
+def test_unhandled_error_does_not_break_the_next_sub_request(client, monkeypatch):
+    def failing_flush(*args, **kwargs):
+        # A flush the route does not expect to fail, leaving the session inactive
+        db.session.add(Card(name=None, card_section_id=1))
+        db.session.flush()
+
+    monkeypatch.setattr(card_section_routes, "keyset_page", failing_flush)
+
+    response = client.post("/api/batch", json={"requests": [
+        {"method": "GET", "path": "/api/card-sections/1/cards"},
+        {"method": "GET", "path": "/api/boards/1/sections"},
+    ]})
+
+    assert [result["status"] for result in response.get_json()["responses"]] == [500, 200]
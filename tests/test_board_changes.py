@@ -0,0 +1,29 @@
+from app.models import BoardChange, CardSection, db, revision
+
+
+def test_change_log_keeps_the_newest_rows(app, client, make_board, monkeypatch):
+    monkeypatch.setattr(revision, "RETAINED_CHANGES", 2)
+    monkeypatch.setattr(revision, "PRUNE_INTERVAL", 1)
+    board_id = make_board(1, 0)
+    with app.app_context():
+        section_id = CardSection.query.filter_by(board_id=board_id).one().id
+
+    # Revisions 2 to 5 each log one card
+    cards = [
+        client.post(f"/api/card-sections/{section_id}/cards", json={"name": f"Card {number}"}).get_json()
+        for number in range(4)
+    ]
+
+    with app.app_context():
+        kept = db.session.execute(
+            db.select(BoardChange.revision).where(BoardChange.board_id == board_id).order_by(BoardChange.revision)
+        ).scalars().all()
+    assert kept == [4, 5]
+
+    # A client whose revision was pruned away reloads the board
+    behind = client.get(f"/api/boards/{board_id}/changes?since=2").get_json()
+    assert behind["resync"] is True
+
+    current = client.get(f"/api/boards/{board_id}/changes?since=3").get_json()
+    assert "resync" not in current
+    assert [card["id"] for card in current["cards"]] == [card["id"] for card in cards[2:]]
@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.mark.parametrize("board_id", [2, "2"])
+def test_add_favorite_accepts_numeric_ids(client, board_id):
+    response = client.post("/api/favorites", json={"board_id": board_id})
+
+    assert response.status_code in (200, 201)
+    assert response.get_json()["boardId"] == 2
+
+
+@pytest.mark.parametrize("board_id", [None, "", "3a", "-3", True, 2**63])
+def test_add_favorite_rejects_other_ids(client, board_id):
+    response = client.post("/api/favorites", json={"board_id": board_id})
+
+    assert response.status_code == 400
@@ -0,0 +1,30 @@
+from app.models import Card, db
+
+
+def label_named(client, name):
+    return next((label for label in client.get("/api/labels").get_json()["labels"] if label["name"] == name), None)
+
+
+def test_rename_that_overflows_a_cards_labels_is_rejected(app, client):
+    # Imports and earlier renames can fill the column past what the card form allows
+    with app.app_context():
+        labels = ", ".join(["Short"] + [str(digit) * 50 for digit in range(4)])
+        db.session.add(Card(name="Crowded", labels=labels, card_section_id=1, owner_id=1))
+        db.session.commit()
+    label = label_named(client, "Short")
+
+    response = client.put(f"/api/labels/{label['id']}", json={"name": "y" * 50})
+
+    assert response.status_code == 400
+    assert label_named(client, "Short") is not None
+
+
+def test_labels_without_cards_are_deleted(client):
+    card = client.post("/api/card-sections/1/cards", json={"name": "Temporary", "labels": "Only here"}).get_json()
+    assert label_named(client, "Only here")["cardCount"] == 1
+
+    client.put(f"/api/cards/{card['id']}", json={"name": "Temporary", "labels": "Elsewhere"})
+    assert label_named(client, "Only here") is None
+
+    client.delete(f"/api/cards/{card['id']}")
+    assert label_named(client, "Elsewhere") is None
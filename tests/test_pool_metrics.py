@@ -0,0 +1,33 @@
+from flask import Flask
+from sqlalchemy import create_engine
+
+from app import pool_metrics
+from app.config import Config
+
+
+class PostgresConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "postgresql://app@localhost/app"
+    SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": 2, "max_overflow": 3}
+    SQLALCHEMY_BINDS = {"replica_0": {"url": "postgresql://app@replica/app", "max_overflow": 4}}
+
+
+def test_init_app_times_every_pool_without_changing_the_config_class():
+    app = Flask(__name__)
+    app.config.from_object(PostgresConfig)
+
+    pool_metrics.init_app(app)
+
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["poolclass"] is pool_metrics.TimedQueuePool
+    assert app.config["SQLALCHEMY_BINDS"]["replica_0"]["poolclass"] is pool_metrics.TimedQueuePool
+    assert "poolclass" not in PostgresConfig.SQLALCHEMY_ENGINE_OPTIONS
+    assert "poolclass" not in PostgresConfig.SQLALCHEMY_BINDS["replica_0"]
+
+
+def test_snapshot_reports_the_configured_overflow_after_recreate():
+    engine = create_engine("sqlite://", poolclass=pool_metrics.TimedQueuePool, pool_size=2, max_overflow=3)
+    engine.dispose()
+
+    snapshot = pool_metrics.snapshot({None: engine, "replica_0": engine})
+
+    assert snapshot["pools"]["primary"]["max_overflow"] == 3
+    assert snapshot["pools"]["replica_0"]["pool"] == "TimedQueuePool"
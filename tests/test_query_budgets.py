@@ -0,0 +1,23 @@
+import pytest
+
+from app.sql_metrics import statement_count
+
+# Most statements a route may issue on a board cache miss, whatever the
+# board size: access check, sections, cards. A lazy load coming back adds
+# one statement per section.
+QUERY_BUDGETS = {
+    "board detail": ("/api/boards/{board_id}", 3),
+    "board sections": ("/api/boards/{board_id}/sections", 3),
+}
+
+
+@pytest.mark.parametrize("name", QUERY_BUDGETS)
+@pytest.mark.parametrize("sections, cards_per_section", [(1, 1), (5, 4), (12, 10)])
+def test_board_routes_stay_within_statement_budget(client, make_board, name, sections, cards_per_section):
+    path, budget = QUERY_BUDGETS[name]
+    board_id = make_board(sections, cards_per_section)
+
+    response = client.get(path.format(board_id=board_id))
+
+    assert response.status_code == 200
+    assert statement_count(response) <= budget, f"{name} issued {statement_count(response)} statements"
@@ -0,0 +1,95 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db
+
+# Requests covering the hot paths of every blueprint, in an order that keeps
+# the seed data valid (card 1 has the "High Priority" label, board 1 its cards)
+SCENARIO = [
+    ("GET", "/api/auth/", None),
+    ("GET", "/api/users/?limit=1", None),
+    ("GET", "/api/users/1", None),
+    ("GET", "/api/boards?limit=1", None),
+    ("GET", "/api/boards/1", None),
+    ("GET", "/api/boards/1/sections", None),
+    ("GET", "/api/boards/1/changes?since=0", None),
+    ("GET", "/api/boards/1/export", None),
+    ("GET", "/api/card-sections/1/cards?limit=1", None),
+    ("GET", "/api/favorites?limit=1", None),
+    ("GET", "/api/bootstrap", None),
+    ("GET", "/api/search?q=project", None),
+    ("GET", "/api/labels", None),
+    ("GET", "/api/labels/cards?label=High+Priority&label=Documentation", None),
+    ("GET", "/api/labels/cards?label=High+Priority&match=any", None),
+    ("POST", "/api/card-sections/1/cards", {"name": "Plan check card", "labels": "Plan check"}),
+    ("PUT", "/api/cards/1", {"name": "Write project proposal", "labels": "High Priority, Plan check"}),
+    ("POST", "/api/cards/3/move", {"beforeId": 1}),
+    ("PUT", "/api/cards/reorder", {"reorderedCards": [
+        {"id": 1, "order": 0, "cardSectionId": 1},
+        {"id": 2, "order": 1, "cardSectionId": 1},
+        {"id": 3, "order": 2, "cardSectionId": 1},
+    ]}),
+    ("POST", "/api/favorites", {"board_id": 2}),
+    ("PUT", "/api/boards/1", {"name": "Work Tasks"}),
+]
+
+# Statements that are not the routes' own queries
+IGNORED = re.compile(r"^\s*(PRAGMA|SAVEPOINT|RELEASE|ROLLBACK|INSERT)\b|sqlite_master|alembic_version", re.I)
+
+
+def table_scans(statement, plan_lines, tables):
+    """Names of real tables that a SQLite plan reads without an index"""
+    # A first keyset page walks the table in primary key order and stops at
+    # the LIMIT, so it reads no more rows than it returns
+    if (
+        re.search(r"\bLIMIT\b", statement) and not re.search(r"\bWHERE\b", statement)
+        and not any("TEMP B-TREE" in line for line in plan_lines)
+    ):
+        return []
+    scanned = []
+    for line in plan_lines:
+        match = re.match(r"\s*SCAN (?:TABLE )?(\w+)", line)
+        if match and match.group(1) in tables and "USING" not in line:
+            scanned.append(match.group(1))
+    return scanned
+
+
+@pytest.fixture
+def route_statements(app, client):
+    """Runs the scenario and returns every distinct statement it issued, with its parameters"""
+    captured = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not IGNORED.search(statement):
+            captured.setdefault(statement, parameters[0] if executemany else parameters)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for method, path, body in SCENARIO:
+            response = client.open(path, method=method, json=body)
+            assert response.status_code < 400, f"{method} {path}: {response.get_data(as_text=True)}"
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return captured
+
+
+def test_route_queries_use_indexes(app, route_statements):
+    tables = {table.name for table in db.metadata.sorted_tables}
+    failures = []
+    with app.app_context():
+        with db.engine.connect() as connection:
+            for statement, parameters in route_statements.items():
+                plan = [
+                    row[-1]
+                    for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                ]
+                scanned = table_scans(statement, plan, tables)
+                if scanned:
+                    failures.append(f"{', '.join(scanned)} scanned by:\n{statement}\n" + "\n".join(plan))
+
+    assert route_statements
+    assert not failures, "\n\n".join(failures)
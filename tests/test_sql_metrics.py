@@ -0,0 +1,28 @@
+from app.sql_metrics import statement_count
+
+
+def test_failed_statements_are_counted(app):
+    client = app.test_client()
+    client.get("/api/auth/")
+    signup = {
+        "username": "Demo", "email": "demo@aa.io",
+        "password": "password", "confirm_password": "password",
+    }
+
+    response = client.post("/api/auth/signup", data=signup)
+
+    # The INSERT runs and fails on the unique constraints
+    assert response.status_code == 401
+    assert statement_count(response) == 1
+
+
+def test_metrics_require_the_configured_token(app, client, monkeypatch):
+    assert client.get("/api/metrics").status_code == 404
+
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "metrics-token")
+    assert client.get("/api/metrics").status_code == 403
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+
+    response = app.test_client().get("/api/metrics", headers={"Authorization": "Bearer metrics-token"})
+    assert response.status_code == 200
+    assert "failed_queries" in response.get_json()["sql"]